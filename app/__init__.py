@@ -1,12 +1,10 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask_migrate import Migrate
 from config import Config
 
 # Initialize extensions
 db = SQLAlchemy()
-migrate = Migrate()
 login = LoginManager()
 login.login_view = 'login'
 login.login_message = 'Please log in to access this page.'
@@ -15,18 +13,51 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
-    # Initialize Flask extensions
+    # CLI commands and Flask-Migrate are wired up on first use so web workers skip importing them
+    from app import cli
+    app.cli = cli.LazyAppGroup(app)
+
+    # Initialize Flask extensions; the engine profile must be resolved before the engine is built
+    from app import database
+    database.configure(app)
     db.init_app(app)
-    migrate.init_app(app, db)
+    database.init_app(app)
     login.init_app(app)
+    if cli.in_cli():
+        # `flask db` is a plugin command that bypasses app.cli, so Migrate must be ready up front
+        cli.init_migrate(app)
+
+    # Password hashing, optionally offloaded to a process pool
+    from app import passwords
+    passwords.init_app(app)
+
+    # Server-side cache for dashboard view models and the service list
+    from app import cache
+    cache.init_app(app)
+
+    # Content-addressed storage for task submissions
+    from app import uploads
+    uploads.init_app(app)
+
+    # Jinja bytecode cache and the {% cache %} fragment tag
+    from app import templating
+    templating.init_app(app)
+
+    # Optional write-behind queue that group-commits mood entries
+    from app import write_behind
+    write_behind.init_app(app)
 
     # Register routes
     from app.routes import bp
     app.register_blueprint(bp)
 
-    # Register CLI commands
-    from app.debug_utils import register_commands
-    register_commands(app)
+    # In-process pub/sub for live group messages
+    from app import messaging
+    messaging.init_app(app)
+
+    # Opt-in per-request SQL profiling
+    from app import profiler
+    profiler.init_app(app)
 
     return app
 
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app import db
+from app.cache import cohort_key, get_or_set
+from app.models import MoodEntry
+
+RECENT_DAYS = 7
+BASELINE_DAYS = 30
+ROLLING_WINDOWS = (7, 30)
+
+
+def _grow(array, size):
+    if size <= array.size:
+        return array
+    grown = np.zeros(max(size, array.size * 2), dtype=array.dtype)
+    grown[:array.size] = array
+    return grown
+
+
+def _rolling_mean(sums, counts, window):
+    sum_csum = np.concatenate(([0.0], np.cumsum(sums)))
+    count_csum = np.concatenate(([0.0], np.cumsum(counts)))
+    window_sums = sum_csum[window:] - sum_csum[:-window]
+    window_counts = count_csum[window:] - count_csum[:-window]
+    means = np.full(sums.size, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means[window - 1:] = window_sums / window_counts
+    return means
+
+
+def iter_mood_columns(since, chunk_size=100_000):
+    """Yield (student_ids, days, scores) NumPy chunks for entries on or after `since`.
+
+    Runs as a Core statement on the session's connection so rows skip ORM processing, and
+    truncates dates in SQL so no per-row datetime objects are built.
+    """
+    table = MoodEntry.__table__
+    result = db.session.connection().execute(
+        db.select(table.c.student_id, db.func.date(table.c.date), table.c.score)
+        .where(table.c.date >= since)
+        .execution_options(yield_per=chunk_size)
+    )
+    for rows in result.partitions():
+        student_ids, dates, scores = zip(*rows)
+        yield (
+            np.fromiter(student_ids, dtype=np.int64, count=len(rows)),
+            np.array(dates, dtype='datetime64[D]'),
+            np.fromiter(scores, dtype=np.int64, count=len(rows)),
+        )
+
+
+def cohort_report(as_of=None, days=365, drop_threshold=1.5, max_drops=100, chunk_size=100_000):
+    """Cohort mood distribution, rolling means and sharp per-student drops in one columnar pass.
+
+    Per-day and per-student accumulators are dense arrays updated with np.bincount, so memory is
+    bounded by the horizon and the number of students rather than the number of entries. Entries
+    older than `days` are read only to seed the rolling means and the drop baseline; `entries` and
+    `distribution` cover the last `days` days.
+    """
+    as_of = (as_of or datetime.utcnow()).date()
+    # Read far enough back that the first reported day has a full window for every rolling mean
+    horizon = max(days + max(ROLLING_WINDOWS) - 1, RECENT_DAYS + BASELINE_DAYS)
+    first_day = as_of - timedelta(days=horizon - 1)
+    as_of_day = np.datetime64(as_of, 'D')
+
+    distribution = np.zeros(6, dtype=np.int64)
+    daily_sums = np.zeros(horizon)
+    daily_counts = np.zeros(horizon)
+    recent_sums = np.zeros(0)
+    recent_counts = np.zeros(0)
+    baseline_sums = np.zeros(0)
+    baseline_counts = np.zeros(0)
+    entries = 0
+
+    for student_ids, dates, scores in iter_mood_columns(datetime.combine(first_day, datetime.min.time()), chunk_size):
+        age = (as_of_day - dates).astype(np.int64)
+        keep = (age >= 0) & (age < horizon)
+        student_ids, age, scores = student_ids[keep], age[keep], scores[keep]
+        if not scores.size:
+            continue
+
+        in_range = age < days
+        entries += int(np.count_nonzero(in_range))
+        distribution += np.bincount(scores[in_range], minlength=6)[:6]
+        offset = horizon - 1 - age
+        daily_sums += np.bincount(offset, weights=scores, minlength=horizon)
+        daily_counts += np.bincount(offset, minlength=horizon)
+
+        size = int(student_ids.max()) + 1
+        recent_sums, recent_counts = _grow(recent_sums, size), _grow(recent_counts, size)
+        baseline_sums, baseline_counts = _grow(baseline_sums, size), _grow(baseline_counts, size)
+        recent = age < RECENT_DAYS
+        baseline = (age >= RECENT_DAYS) & (age < RECENT_DAYS + BASELINE_DAYS)
+        n = recent_sums.size
+        recent_sums += np.bincount(student_ids[recent], weights=scores[recent], minlength=n)
+        recent_counts += np.bincount(student_ids[recent], minlength=n)
+        baseline_sums += np.bincount(student_ids[baseline], weights=scores[baseline], minlength=n)
+        baseline_counts += np.bincount(student_ids[baseline], minlength=n)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        daily_means = daily_sums / daily_counts
+        recent_means = recent_sums / recent_counts
+        baseline_means = baseline_sums / baseline_counts
+    rolling = {window: _rolling_mean(daily_sums, daily_counts, window) for window in ROLLING_WINDOWS}
+
+    drops = baseline_means - recent_means
+    flagged = np.flatnonzero((recent_counts > 0) & (baseline_counts > 0) & (drops >= drop_threshold))
+    flagged = flagged[np.argsort(-drops[flagged], kind='stable')][:max_drops]
+
+    def _value(x):
+        return None if np.isnan(x) else round(float(x), 3)
+
+    start = len(daily_means) - days
+    return {
+        'as_of': as_of.isoformat(),
+        'days': days,
+        'entries': entries,
+        'distribution': {score: int(distribution[score]) for score in range(1, 6)},
+        'daily': [
+            {
+                'date': (first_day + timedelta(days=i)).isoformat(),
+                'count': int(daily_counts[i]),
+                'mean': _value(daily_means[i]),
+                **{f'rolling_{window}': _value(rolling[window][i]) for window in ROLLING_WINDOWS}
+            }
+            for i in range(start, horizon)
+        ],
+        'drops': [
+            {
+                'student_id': int(student_id),
+                'recent_mean': _value(recent_means[student_id]),
+                'baseline_mean': _value(baseline_means[student_id]),
+                'drop': _value(drops[student_id])
+            }
+            for student_id in flagged
+        ]
+    }
+
+
+def cached_cohort_report(ttl, days=365):
+    """Return the cohort report for today, recomputed at most once per `ttl` seconds through the app cache.
+
+    Mood writes do not invalidate it: the report scans every entry of the last `days` days, a year
+    by default, plus the 29 before them that seed the rolling means, so under a logging burst the
+    TTL is what bounds how often it is rebuilt. The key carries the date, so a report never
+    outlives the day it was computed for.
+    """
+    as_of = datetime.utcnow()
+    return get_or_set(cohort_key(as_of.date(), days), lambda: cohort_report(as_of=as_of, days=days), ttl)
@@ -0,0 +1,155 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+from app import db
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.deletes = 0
+        self.evictions = 0
+
+    def to_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'sets': self.sets,
+            'deletes': self.deletes,
+            'evictions': self.evictions
+        }
+
+
+class LRUCache:
+    """Thread-safe in-process cache with least-recently-used eviction and per-entry TTL."""
+
+    def __init__(self, max_entries=10000, default_ttl=60):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = CacheStats()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.stats.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + (ttl or self.default_ttl), value)
+            self.entries.move_to_end(key)
+            self.stats.sets += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+            self.stats.deletes += len(keys)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class RedisCache:
+    """Cache backed by a Redis-compatible server; values are pickled, counters are per process."""
+
+    def __init__(self, url, default_ttl=60, prefix='unisupport:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return pickle.loads(value)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or self.default_ttl)
+        self.stats.sets += 1
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+        self.stats.deletes += len(keys)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+def get_cache():
+    return current_app.extensions['cache']
+
+
+def get_or_set(key, loader, ttl=None):
+    """Return the cached value for `key`, computing and storing it with `loader()` on a miss."""
+    cache = get_cache()
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        cache.set(key, value, ttl)
+    return value
+
+
+def dashboard_key(student_id):
+    return f'dashboard:{student_id}'
+
+
+def cohort_key(as_of, days):
+    return f'cohort:{as_of.isoformat()}:{days}'
+
+
+SERVICES_KEY = 'services'
+
+
+def invalidate_on_commit(*keys):
+    """Drop `keys` from the cache once the current transaction commits, so readers never re-cache stale rows."""
+    db.session.info.setdefault('cache_invalidations', set()).update(keys)
+
+
+def _invalidate(session):
+    keys = session.info.pop('cache_invalidations', None)
+    if keys and has_app_context():
+        get_cache().delete(*keys)
+
+
+def _discard(session):
+    session.info.pop('cache_invalidations', None)
+
+
+def init_app(app):
+    """Create the backend named by CACHE_BACKEND ('lru' or 'redis') and hook commit-time invalidation."""
+    if app.config['CACHE_BACKEND'] == 'redis':
+        cache = RedisCache(app.config['CACHE_REDIS_URL'], app.config['CACHE_DEFAULT_TTL'])
+    else:
+        cache = LRUCache(app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_DEFAULT_TTL'])
+    app.extensions['cache'] = cache
+    if not event.contains(db.session, 'after_commit', _invalidate):
+        event.listen(db.session, 'after_commit', _invalidate)
+        event.listen(db.session, 'after_rollback', _discard)
@@ -0,0 +1,49 @@
+import click
+from flask.cli import AppGroup
+
+
+def in_cli():
+    """True while the app is being built by a `flask` command rather than a WSGI server.
+
+    `flask run` counts as a server: the development server it starts handles web requests.
+    """
+    ctx = click.get_current_context(silent=True)
+    return ctx is not None and ctx.info_name != 'run'
+
+
+
+def init_migrate(app):
+    """Wire up Flask-Migrate; Alembic is a heavy import that only `flask db` needs."""
+    if 'migrate' in app.extensions:
+        return
+    from flask_migrate import Migrate
+    from app import db
+    Migrate(app, db)
+
+
+class LazyAppGroup(AppGroup):
+    """The app's `flask` command group, importing debug_utils and registering its commands on first lookup.
+
+    Web workers never list or resolve CLI commands, so they never import the CLI-only modules.
+    """
+
+    def __init__(self, app, **kwargs):
+        super().__init__(app.name, **kwargs)
+        self.app = app
+        self.loaded = False
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        init_migrate(self.app)
+        from app.debug_utils import register_commands
+        register_commands(self.app)
+
+    def get_command(self, ctx, name):
+        self.load()
+        return super().get_command(ctx, name)
+
+    def list_commands(self, ctx):
+        self.load()
+        return super().list_commands(ctx)
@@ -0,0 +1,148 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from app import db
+
+
+# Engine keyword arguments per deployment profile; SQLALCHEMY_ENGINE_OPTIONS overrides any key
+ENGINE_PROFILES = {
+    # Library defaults, no pragmas: what the app used before profiles existed
+    'dev': {},
+    # One SQLite file shared by a few worker processes on one host
+    'sqlite': {
+        'pool_size': 8,
+        'max_overflow': 0,
+        'pool_timeout': 30,
+        'connect_args': {'check_same_thread': False},
+    },
+    # Pooled Postgres behind several workers; recycle below typical idle-connection cutoffs
+    'postgres': {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    },
+}
+
+
+def detect_profile(uri):
+    backend = make_url(uri).get_backend_name()
+    return 'sqlite' if backend == 'sqlite' else 'postgres'
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured profile, merged under any explicit options."""
+    profile = config['DATABASE_PROFILE'] or detect_profile(config['SQLALCHEMY_DATABASE_URI'])
+    options = dict(ENGINE_PROFILES[profile])
+    if make_url(config['SQLALCHEMY_DATABASE_URI']).database in (None, '', ':memory:'):
+        # In-memory SQLite uses a single static connection, so pool sizing does not apply
+        options = {key: value for key, value in options.items() if not key.startswith(('pool_', 'max_'))}
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    return profile, options
+
+
+def _sqlite_on_connect(pragmas, statement_timeout):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+        if statement_timeout:
+            # SQLite has no statement timeout; a progress handler aborts the running statement
+            # (raising OperationalError "interrupted") once the per-statement deadline passes.
+            deadline = [None]
+            dbapi_connection.set_progress_handler(
+                lambda: deadline[0] is not None and time.monotonic() > deadline[0], 10000
+            )
+            connection_record.info['statement_deadline'] = deadline
+    return on_connect
+
+
+def _postgres_on_connect(statement_timeout):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'SET statement_timeout = {int(statement_timeout)}')
+        cursor.close()
+        dbapi_connection.commit()
+    return on_connect
+
+
+def _statement_timeout_ms(context, default):
+    if context is None:
+        return default
+    return context.execution_options.get('statement_timeout', default)
+
+
+def _sqlite_timeout_hooks(default):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        deadline = conn.info.get('statement_deadline')
+        if deadline is not None:
+            timeout = _statement_timeout_ms(context, default)
+            deadline[0] = time.monotonic() + timeout / 1000 if timeout else None
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        deadline = conn.info.get('statement_deadline')
+        if deadline is not None:
+            deadline[0] = None
+    return before_cursor_execute, after_cursor_execute
+
+
+def _postgres_timeout_hooks(default):
+    # Only statements run with a statement_timeout execution option pay for the extra SETs. They go
+    # through the connection, never the statement's own cursor: a second execute() on that cursor would
+    # discard its buffered rows, and a named (server-side) cursor refuses it outright. SET LOCAL lasts
+    # until the transaction ends, which also covers the FETCHes of a streamed result.
+    def set_local(conn, timeout):
+        conn.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout or 0)}',
+                             execution_options={'statement_timeout': default})
+
+    def before_execute(conn, clauseelement, multiparams, params, execution_options):
+        if execution_options.get('statement_timeout', default) != default:
+            set_local(conn, execution_options['statement_timeout'])
+
+    def after_execute(conn, clauseelement, multiparams, params, execution_options, result):
+        streamed = execution_options.get('stream_results') or execution_options.get('yield_per')
+        if execution_options.get('statement_timeout', default) != default and not streamed:
+            set_local(conn, default)
+    return before_execute, after_execute
+
+
+def is_statement_timeout(error):
+    """True for an OperationalError raised because a statement ran past its timeout."""
+    orig = getattr(error, 'orig', None)
+    return 'interrupted' in str(orig) or getattr(orig, 'pgcode', None) == '57014'
+
+
+def configure(app):
+    """Resolve the engine profile into SQLALCHEMY_ENGINE_OPTIONS; call before db.init_app."""
+    profile, options = engine_options(app.config)
+    app.config['DATABASE_PROFILE'] = profile
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def init_app(app):
+    """Install connect-time pragmas and statement timeouts on the app's engine.
+
+    The timeout guards web requests; under the `flask` command it is off, since batch jobs such
+    as roster imports, rollup rebuilds and exports can legitimately run longer.
+    """
+    from app.cli import in_cli
+    profile = app.config['DATABASE_PROFILE']
+    timeout = 0 if in_cli() else app.config['DATABASE_STATEMENT_TIMEOUT_MS']
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name == 'sqlite':
+        pragmas = app.config['SQLITE_PRAGMAS'] if profile != 'dev' else {}
+        event.listen(engine, 'connect', _sqlite_on_connect(pragmas, timeout))
+        before, after = _sqlite_timeout_hooks(timeout)
+        event.listen(engine, 'before_cursor_execute', before)
+        event.listen(engine, 'after_cursor_execute', after)
+    elif engine.dialect.name == 'postgresql':
+        if timeout:
+            event.listen(engine, 'connect', _postgres_on_connect(timeout))
+        before, after = _postgres_timeout_hooks(timeout)
+        event.listen(engine, 'before_execute', before)
+        event.listen(engine, 'after_execute', after)
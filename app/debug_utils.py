@@ -1,7 +1,11 @@
 import datetime
-from werkzeug.security import generate_password_hash
+import json
+import os
+import click
+from flask import current_app
 from app import db
-from app.models import User, Task, Message, Group, GroupTaskStatus, Student, SupportService, AppointmentSlot, MoodEntry, Appointment
+from app.passwords import get_hasher
+from app.models import User, Task, GroupTaskStatus, Student, SupportService, MoodEntry, MoodRollup, Appointment
 import random
 
 
@@ -11,36 +15,53 @@ def reset_db():
     db.create_all()
 
 
+SEED_PASSWORDS = {
+    'John Doe': 'admin.pw',
+    'Alice Green': 'AliceGreen1234!',
+    'Mia Clarke': 'MiaClarke1234!',
+    'Sophia Taylor': 'SophiaTaylor1234!',
+    'Liam Scott': 'LiamScott1234!',
+    'James Black': 'JamesBlack1234!',
+    'Emma Gray': 'EmmaGray1234!',
+    'Lucas King': 'LucasKing1234!',
+    'Zoe Williams': 'ZoeWilliams1234!'
+}
+
+
 def generate_users():
-    """Generate and return a list of user objects."""
+    """Generate and return a list of user objects, hashing seed passwords in parallel."""
     users = [
         User(username='John Doe', student_id=1, email='john.doe@student.bham.ac.uk', role='Admin',
-             password_hash=generate_password_hash('admin.pw'), registered=True),
+             registered=True),
         User(username='Alice Green', student_id=1111111, email='alicegreen@student.bham.ac.uk', role='Student',
-             password_hash=generate_password_hash('AliceGreen1234!'), registered=True),
+             registered=True),
         User(username='Robert Brown', student_id=2222222, email='robertbrown@student.bham.ac.uk', role='Student',
              registered=False),
         User(username='Mia Clarke', student_id=3333333, email='miaclarke@student.bham.ac.uk', role='Admin',
-             password_hash=generate_password_hash('MiaClarke1234!'), registered=True),
+             registered=True),
         User(username='Ethan James', student_id=4444444, email='ethanjames@student.bham.ac.uk', role='Student',
              registered=False),
         User(username='Sophia Taylor', student_id=5555555, email='sophiataylor@bstudent.bham.ac.uk', role='Mentor',
-             password_hash=generate_password_hash('SophiaTaylor1234!'), registered=True),
+             registered=True),
         User(username='Liam Scott', student_id=6666666, email='liamscott@student.bham.ac.uk', role='Admin',
-             password_hash=generate_password_hash('LiamScott1234!'), registered=True),
+             registered=True),
         User(username='Olivia White', student_id=7777777, email='oliviawhite@student.bham.ac.uk', role='Student',
              registered=False),
         User(username='James Black', student_id=8888888, email='jamesblack@student.bham.ac.uk', role='Admin',
-             password_hash=generate_password_hash('JamesBlack1234!'), registered=True),
+             registered=True),
         User(username='Emma Gray', student_id=2000000, email='emmagray@b.com', role='Student',
-             password_hash=generate_password_hash('EmmaGray1234!'), registered=True),
+             registered=True),
         User(username='Lucas King', student_id=3000000, email='lucasking@b.com', role='Mentor',
-             password_hash=generate_password_hash('LucasKing1234!'), registered=True),
+             registered=True),
         User(username='Sophia Adams', student_id=9999999, email='sophiaadams@student.bham.ac.uk', role='Student',
              registered=False),
         User(username='Zoe Williams', student_id=1000000, email='zoewilliams@student.bham.ac.uk', role='Mentor',
-             password_hash=generate_password_hash('ZoeWilliams1234!'), registered=True)
+             registered=True)
     ]
+    with_password = [user for user in users if user.username in SEED_PASSWORDS]
+    hashes = get_hasher().hash_many(SEED_PASSWORDS[user.username] for user in with_password)
+    for user, pwhash in zip(with_password, hashes):
+        user.password_hash = pwhash
     return users
 
 
@@ -95,30 +116,33 @@ def generate_students(users):
     return students
 
 
-def generate_appointment_slots(services):
-    """Generate appointment slots for each service."""
-    slots = []
-    for service in services:
-        current_date = datetime.datetime.now()
-        for _ in range(14):  # Generate slots for next 14 days
-            current_date += datetime.timedelta(days=1)
-            if current_date.weekday() < 5:  # Only weekdays
-                for hour in range(9, 17):  # 9 AM to 5 PM
-                    slot = AppointmentSlot(
-                        service=service,
-                        date=current_date.replace(hour=hour, minute=0)
-                    )
-                    slots.append(slot)
-    return slots
+def generate_appointment_slots(services=None, days=14):
+    """Bulk-generate appointment slots for the next `days` days from each service's schedule."""
+    until = datetime.datetime.now() + datetime.timedelta(days=days)
+    inserted = SupportService.extend_slots(until, services)
+    db.session.commit()
+    return inserted
 
 
 def generate_group_task_status():
-    """Generate and assign GroupTaskStatus to each group and task."""
-    for group in db.session.scalars(db.select(Group)):
-        for task in db.session.scalars(db.select(Task)):
-            group_status = GroupTaskStatus(group_id=group.id, task_id=task.id)
-            db.session.add(group_status)
+    """Create any missing GroupTaskStatus rows for every group and task with one INSERT ... SELECT."""
+    created = GroupTaskStatus.materialize()
+    db.session.commit()
+    return created
+
+
+def rebuild_mood_rollups(batch_size=5000):
+    """Recompute all mood rollups from mood_entries in one streaming pass; each batch is folded by MoodRollup.record_many."""
+    db.session.execute(db.delete(MoodRollup))
+    entries = db.session.execute(
+        db.select(MoodEntry.student_id, MoodEntry.score, MoodEntry.date)
+        .order_by(MoodEntry.student_id, MoodEntry.date, MoodEntry.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for batch in entries.partitions():
+        MoodRollup.record_many(batch)
     db.session.commit()
+    return db.session.scalar(db.select(db.func.count()).select_from(MoodRollup))
 
 
 def populate_db():
@@ -129,8 +153,8 @@ def populate_db():
         User(username='test_staff', email='staff@test.com', role='staff')
     ]
     
-    for user in users:
-        user.set_password('password')
+    for user, pwhash in zip(users, get_hasher().hash_many(['password'] * len(users))):
+        user.password_hash = pwhash
         db.session.add(user)
     
     db.session.commit()
@@ -174,7 +198,7 @@ def populate_db():
     for i in range(7):
         entry = MoodEntry(
             student=student,
-            score=random.randint(1, 10),
+            score=random.randint(1, 5),
             notes=f"Test mood entry {i+1}",
             activities=random.choice(activities),
             date=datetime.datetime.utcnow() - datetime.timedelta(days=i)
@@ -193,6 +217,12 @@ def populate_db():
     
     db.session.commit()
 
+    # The seeded entries bypass Student.log_mood, so build their rollups for the dashboard
+    rebuild_mood_rollups()
+
+    # Booking claims a slot row, so open the services' schedules up to the usual horizon
+    generate_appointment_slots(days=current_app.config['SLOT_HORIZON_DAYS'])
+
 
 def register_commands(app):
     @app.cli.command("init-db")
@@ -207,4 +237,107 @@ def register_commands(app):
         reset_db()
         print("Database reset complete.")
 
+    @app.cli.command("rebuild-mood-rollups")
+    def rebuild_mood_rollups_command():
+        """Backfill daily and weekly mood rollups from all mood entries."""
+        written = rebuild_mood_rollups()
+        print(f"Rebuilt {written} mood rollup rows.")
+
+    @app.cli.command("import-roster")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default=None,
+                  help="Roster format (guessed from the file extension by default).")
+    @click.option("--chunk-size", default=1000, help="Rows validated and inserted per transaction.")
+    @click.option("--restart", is_flag=True, help="Ignore saved progress and start from the first row.")
+    def import_roster_command(path, fmt, chunk_size, restart):
+        """Provision students from a CSV/JSONL roster (username, email, student_id, name, role, password)."""
+        from app.roster import RosterImport
+        importer = RosterImport(path, fmt=fmt, chunk_size=chunk_size)
+        stats = importer.run(restart=restart, report=lambda stats: print(
+            f"\r{stats['processed']} rows, {stats['inserted']} inserted, {stats['rejected']} rejected", end=""))
+        print()
+        if stats['rejected']:
+            print(f"Rejected rows are listed in {importer.error_path}")
+
+    @app.cli.command("export-data")
+    @click.argument("kind", type=click.Choice(["mood", "appointments"]))
+    @click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default="csv")
+    @click.option("--student-id", default=None, type=int, help="Only export this student's rows.")
+    @click.option("--output", type=click.File("w"), default="-", help="Output file (stdout by default).")
+    @click.option("--chunk-size", default=None, type=int, help="Rows fetched per cursor batch.")
+    def export_data_command(kind, fmt, student_id, output, chunk_size):
+        """Stream mood entries or appointments as CSV or NDJSON."""
+        from app.exports import stream_export
+        for chunk in stream_export(kind, fmt, student_id=student_id,
+                                   chunk_size=chunk_size or app.config['EXPORT_CHUNK_SIZE']):
+            output.write(chunk)
+
+    @app.cli.command("generate-slots")
+    @click.option("--days", default=None, type=int, help="Horizon in days (defaults to SLOT_HORIZON_DAYS).")
+    def generate_slots_command(days):
+        """Extend every service's appointment slots up to the rolling horizon."""
+        days = days or app.config['SLOT_HORIZON_DAYS']
+        inserted = generate_appointment_slots(days=days)
+        print(f"Generated {inserted} appointment slots up to {days} days ahead.")
+
+    @app.cli.command("task-scheduler")
+    @click.option("--once", is_flag=True, help="Apply transitions that are already due, then exit.")
+    def task_scheduler_command(once):
+        """Run the task lifecycle worker that flips group task statuses at task boundaries."""
+        from app.scheduler import TaskLifecycleScheduler
+        scheduler = TaskLifecycleScheduler(
+            app,
+            lookahead=datetime.timedelta(hours=app.config['TASK_SCHEDULER_LOOKAHEAD_HOURS']),
+            max_sleep=app.config['TASK_SCHEDULER_MAX_SLEEP']
+        )
+        if once:
+            print(f"Updated {scheduler.catch_up()} task statuses.")
+            return
+        print("Task scheduler running; press Ctrl+C to stop.")
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            scheduler.stop()
+
+    @app.cli.command("profile-report")
+    @click.option("--log", "log_path", default=None, help="Profile log to read (defaults to SQL_PROFILER_LOG).")
+    @click.option("--json", "as_json", is_flag=True, help="Print the aggregated report as JSON.")
+    def profile_report_command(log_path, as_json):
+        """Summarise per-endpoint SQL profiles recorded by the request profiler."""
+        from app.profiler import aggregate, load_profile_log
+        log_path = log_path or app.config['SQL_PROFILER_LOG']
+        if not os.path.exists(log_path):
+            print(f"No profile log at {log_path}; set SQL_PROFILER_ENABLED=1 and make some requests.")
+            return
+        report = aggregate(load_profile_log(log_path))
+        if as_json:
+            print(json.dumps(report, indent=2))
+            return
+        print(f"{'endpoint':<28}{'requests':>9}{'avg q':>8}{'p95 q':>7}{'max q':>7}{'avg db ms':>11}{'N+1':>6}")
+        for endpoint, stats in sorted(report.items(), key=lambda item: -item[1]['avg_queries']):
+            print(f"{endpoint:<28}{stats['requests']:>9}{stats['avg_queries']:>8}{stats['p95_queries']:>7}"
+                  f"{stats['max_queries']:>7}{stats['avg_db_ms']:>11}{stats['n_plus_one_requests']:>6}")
+            for statement, count in stats['top_repeated']:
+                print(f"    x{count} {statement[:100]}")
+
+    @app.cli.command("cohort-analytics")
+    @click.option("--days", default=365, help="Number of days of history to analyse.")
+    @click.option("--drop-threshold", default=1.5, help="Minimum fall from the 30-day baseline to flag.")
+    @click.option("--chunk-size", default=100_000, help="Rows fetched per columnar chunk.")
+    @click.option("--json", "as_json", is_flag=True, help="Print the full report as JSON.")
+    def cohort_analytics_command(days, drop_threshold, chunk_size, as_json):
+        """Run the vectorized cohort mood analytics batch job."""
+        from app.analytics import cohort_report
+        report = cohort_report(days=days, drop_threshold=drop_threshold, chunk_size=chunk_size)
+        if as_json:
+            print(json.dumps(report, indent=2))
+            return
+        print(f"Entries analysed: {report['entries']} (as of {report['as_of']})")
+        print("Score distribution: " + ", ".join(f"{k}={v}" for k, v in report['distribution'].items()))
+        latest = report['daily'][-1]
+        print(f"Rolling means: 7-day={latest['rolling_7']}, 30-day={latest['rolling_30']}")
+        print(f"Students with a sharp drop: {len(report['drops'])}")
+        for drop in report['drops']:
+            print(f"  student {drop['student_id']}: {drop['baseline_mean']} -> {drop['recent_mean']}")
+
 
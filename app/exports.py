@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from app import db
+from app.models import MoodEntry, Appointment
+
+
+EXPORT_COLUMNS = {
+    'mood': (MoodEntry.id, MoodEntry.student_id, MoodEntry.date, MoodEntry.score, MoodEntry.notes,
+             MoodEntry.activities),
+    'appointments': (Appointment.id, Appointment.student_id, Appointment.service_type, Appointment.date,
+                     Appointment.status, Appointment.slot_id),
+}
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def export_statement(kind, student_id=None, start=None, end=None):
+    """Column-only select for one export, ordered by (student_id, date, id) to follow the composite index."""
+    columns = EXPORT_COLUMNS[kind]
+    model = columns[0].class_
+    query = sa.select(*columns)
+    if student_id is not None:
+        query = query.where(model.student_id == student_id)
+    if start is not None:
+        query = query.where(model.date >= start)
+    if end is not None:
+        query = query.where(model.date < end)
+    return query.order_by(model.student_id, model.date, model.id)
+
+
+def iter_export_rows(kind, student_id=None, start=None, end=None, chunk_size=5000):
+    """Yield plain row tuples through a server-side cursor, `chunk_size` rows buffered at a time."""
+    # A full export can outlast the per-statement timeout, so it runs without one
+    statement = export_statement(kind, student_id, start, end).execution_options(
+        yield_per=chunk_size, statement_timeout=0
+    )
+    with db.engine.connect() as connection:
+        for partition in connection.execute(statement).partitions():
+            yield partition
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_csv(kind, partitions):
+    """Encode row partitions as CSV, one string per partition so the response is not chatty."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in EXPORT_COLUMNS[kind]])
+    yield buffer.getvalue()
+    for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+
+
+def iter_ndjson(kind, partitions):
+    keys = [column.key for column in EXPORT_COLUMNS[kind]]
+    for rows in partitions:
+        yield ''.join(
+            json.dumps(dict(zip(keys, (_value(value) for value in row)))) + '\n' for row in rows
+        )
+
+
+def stream_export(kind, fmt, student_id=None, start=None, end=None, chunk_size=5000):
+    """Generator of encoded text chunks for one export; memory is bounded by `chunk_size`."""
+    partitions = iter_export_rows(kind, student_id, start, end, chunk_size)
+    encode = iter_csv if fmt == 'csv' else iter_ndjson
+    return encode(kind, partitions)
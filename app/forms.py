@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, BooleanField, SubmitField, TextAreaField, SelectField, RadioField
-from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError
+from wtforms.validators import DataRequired, Email, Length, EqualTo
 from app.models import User
 
 class LoginForm(FlaskForm):
@@ -18,15 +18,21 @@ class RegisterForm(FlaskForm):
     password2 = PasswordField('Repeat Password', validators=[DataRequired(), EqualTo('password')])
     submit = SubmitField('Register')
 
-    def validate_username(self, username):
-        user = User.query.filter_by(username=username.data).first()
-        if user is not None:
-            raise ValidationError('Please use a different username.')
+    UNIQUE_MESSAGES = {
+        'username': 'Please use a different username.',
+        'email': 'Please use a different email address.'
+    }
 
-    def validate_email(self, email):
-        user = User.query.filter_by(email=email.data).first()
-        if user is not None:
-            raise ValidationError('Please use a different email address.')
+    def validate(self, extra_validators=None):
+        if not super().validate(extra_validators):
+            return False
+        taken = User.taken_fields(self.username.data, self.email.data)
+        self.add_taken_errors(taken)
+        return not taken
+
+    def add_taken_errors(self, taken):
+        for field in taken:
+            getattr(self, field).errors.append(self.UNIQUE_MESSAGES[field])
 
 class MoodLogForm(FlaskForm):
     score = RadioField('Mood Score', choices=[(str(i), str(i)) for i in range(1, 6)], validators=[DataRequired()])
@@ -0,0 +1,120 @@
+import json
+import threading
+from collections import deque
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from werkzeug.utils import import_string
+
+from app import db
+
+
+class Subscription:
+    """A subscriber's bounded buffer of pending events.
+
+    When a slow consumer falls `maxlen` events behind, the oldest events are dropped rather than
+    blocking the publisher; the drop count is reported on the next read so the client can resync.
+    """
+
+    def __init__(self, group_id, maxlen):
+        self.group_id = group_id
+        self.events = deque(maxlen=maxlen)
+        self.dropped = 0
+        self.closed = False
+        self.ready = threading.Condition(threading.Lock())
+
+    def put(self, payload):
+        with self.ready:
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append(payload)
+            self.ready.notify()
+
+    def get(self, timeout=None):
+        """Wait for events; returns (events, dropped), or ([], 0) on timeout or close."""
+        with self.ready:
+            if not self.events and not self.closed:
+                self.ready.wait(timeout)
+            events, dropped = list(self.events), self.dropped
+            self.events.clear()
+            self.dropped = 0
+            return events, dropped
+
+    def close(self):
+        with self.ready:
+            self.closed = True
+            self.ready.notify_all()
+
+
+class InProcessBroker:
+    """Fan out published payloads to per-group subscriber buffers within one process."""
+
+    def __init__(self, buffer_size=100):
+        self.buffer_size = buffer_size
+        self.groups = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, group_id):
+        subscription = Subscription(group_id, self.buffer_size)
+        with self.lock:
+            self.groups.setdefault(group_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        with self.lock:
+            subscribers = self.groups.get(subscription.group_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.groups[subscription.group_id]
+
+    def publish(self, group_id, payload):
+        with self.lock:
+            subscribers = list(self.groups.get(group_id, ()))
+        for subscription in subscribers:
+            subscription.put(payload)
+        return len(subscribers)
+
+    def subscriber_count(self, group_id=None):
+        with self.lock:
+            if group_id is not None:
+                return len(self.groups.get(group_id, ()))
+            return sum(len(subscribers) for subscribers in self.groups.values())
+
+
+def message_payload(message):
+    data = message.to_dict()
+    data['sent_time'] = message.sent_time.isoformat()
+    return data
+
+
+def _collect_messages(session, flush_context):
+    from app.models import Message
+    pending = session.info.setdefault('published_messages', [])
+    pending.extend(message_payload(obj) for obj in session.new if isinstance(obj, Message))
+
+
+def _publish_messages(session):
+    pending = session.info.pop('published_messages', None)
+    if not pending or not has_app_context():
+        return
+    broker = current_app.extensions.get('message_broker')
+    if broker is None:
+        return
+    for payload in pending:
+        broker.publish(payload['group_id'], json.dumps(payload))
+
+
+def _discard_messages(session):
+    session.info.pop('published_messages', None)
+
+
+def init_app(app):
+    """Create the configured broker and publish new Message rows to it once their transaction commits."""
+    broker_class = import_string(app.config['MESSAGE_BROKER'])
+    app.extensions['message_broker'] = broker_class(buffer_size=app.config['MESSAGE_STREAM_BUFFER'])
+    if not event.contains(db.session, 'after_flush', _collect_messages):
+        event.listen(db.session, 'after_flush', _collect_messages)
+        event.listen(db.session, 'after_commit', _publish_messages)
+        event.listen(db.session, 'after_rollback', _discard_messages)
@@ -1,11 +1,13 @@
+import heapq
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import sqlalchemy as sa
 import sqlalchemy.orm as so
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 
 from app import db, login
+from app.cache import SERVICES_KEY, dashboard_key, invalidate_on_commit
+from app.passwords import get_hasher
 
 
 # -----------------------------
@@ -28,11 +30,34 @@ class User(UserMixin, db.Model):
     my_message: so.Mapped[list['Message']] = so.relationship(back_populates='user', cascade='all, delete-orphan')
     student_profile: so.Mapped[Optional['Student']] = so.relationship(back_populates='user', uselist=False)
 
+    STAFF_ROLES = ('staff', 'admin', 'mentor')
+
+    @property
+    def is_staff(self):
+        return (self.role or '').lower() in self.STAFF_ROLES
+
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = get_hasher().hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return get_hasher().verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return get_hasher().needs_rehash(self.password_hash)
+
+    @classmethod
+    def taken_fields(cls, username, email):
+        """Return which of ('username', 'email') already belong to a user, in one indexed query."""
+        rows = db.session.execute(
+            db.select(cls.username, cls.email).where(sa.or_(cls.username == username, cls.email == email))
+        ).all()
+        taken = set()
+        for row in rows:
+            if row.username == username:
+                taken.add('username')
+            if row.email == email:
+                taken.add('email')
+        return taken
 
     def to_dict(self):
         return {
@@ -48,9 +73,22 @@ class User(UserMixin, db.Model):
         return f'User(id={self.id}, username={self.username}, email={self.email}, role={self.role}, pwh={pwh})'
 
 
+def upsert_insert(table):
+    """INSERT for the bound dialect with ON CONFLICT support (SQLite and Postgres)."""
+    # Imported here so loading the models does not pull in both dialect packages
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
 @login.user_loader
 def load_user(user_id):
-    return db.session.get(User, int(user_id))
+    # Load the student profile in the same query; routes read it via current_user.student_profile
+    return db.session.scalar(
+        sa.select(User).options(so.joinedload(User.student_profile)).where(User.id == int(user_id))
+    )
 
 
 # -----------------------------
@@ -65,12 +103,34 @@ class Group(db.Model):
     taskstatus: so.Mapped[list['GroupTaskStatus']] = so.relationship(back_populates='group', cascade='all, delete-orphan')
     message: so.Mapped[list['Message']] = so.relationship(back_populates='group', cascade='all, delete-orphan')
 
-    def to_dict(self):
-        return {
+    def to_dict(self, depth=2):
+        data = {
             'id': self.id,
-            'users': [user.to_dict() for user in self.users],
-            'taskstatus': [status.to_dict() for status in self.taskstatus]
+            'users': [user.to_dict() for user in self.users]
         }
+        if depth >= 1:
+            data['taskstatus'] = [status.to_dict(depth - 1) for status in self.taskstatus]
+        return data
+
+    @staticmethod
+    def loader_options(depth=2):
+        """Eager-load exactly what to_dict(depth) touches, so serialization runs a fixed number of queries."""
+        options = [so.selectinload(Group.users)]
+        if depth >= 1:
+            statuses = so.selectinload(Group.taskstatus)
+            if depth >= 2:
+                task = statuses.joinedload(GroupTaskStatus.task)
+                if depth >= 3:
+                    task = task.selectinload(Task.groupstatus)
+                statuses = task
+            options.append(statuses)
+        return options
+
+    @classmethod
+    def load_serializable(cls, group_ids, depth=2):
+        return db.session.scalars(
+            sa.select(cls).where(cls.id.in_(group_ids)).options(*cls.loader_options(depth))
+        ).all()
 
 
 # -----------------------------
@@ -83,23 +143,26 @@ class Task(db.Model):
     title: so.Mapped[str] = so.mapped_column(sa.String(64))
     description: so.Mapped[str] = so.mapped_column(sa.String(1024))
     isUpload: so.Mapped[bool] = so.mapped_column(default=False)
-    start_datetime: so.Mapped[datetime] = so.mapped_column(sa.DateTime())
-    end_datetime: so.Mapped[datetime] = so.mapped_column(sa.DateTime())
+    start_datetime: so.Mapped[datetime] = so.mapped_column(sa.DateTime(), index=True)
+    end_datetime: so.Mapped[datetime] = so.mapped_column(sa.DateTime(), index=True)
     location: so.Mapped[str] = so.mapped_column(sa.String(128))
 
     groupstatus: so.Mapped[list['GroupTaskStatus']] = so.relationship(back_populates='task', cascade='all, delete-orphan')
 
-    def to_dict(self):
-        return {
+    def to_dict(self, depth=1):
+        data = {
             'id': self.id,
             'title': self.title,
             'description': self.description,
             'isUpload': self.isUpload,
-            'groupstatus': [status.to_dict() for status in self.groupstatus],
             'start_datetime': self.start_datetime,
             'end_datetime': self.end_datetime,
             'location': self.location
         }
+        if depth >= 1:
+            # Statuses are serialized without their task to avoid recursing back into this one
+            data['groupstatus'] = [status.to_dict(0) for status in self.groupstatus]
+        return data
 
 
 # -----------------------------
@@ -113,29 +176,175 @@ class GroupTaskStatus(db.Model):
     group_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('groups.id'), primary_key=True)
     group: so.Mapped['Group'] = so.relationship(back_populates='taskstatus')
 
-    task_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('tasks.id'), primary_key=True)
+    # The primary key leads with group_id, so task-keyed transitions need their own index
+    task_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('tasks.id'), primary_key=True, index=True)
     task: so.Mapped['Task'] = so.relationship(back_populates='groupstatus')
 
+    def to_dict(self, depth=1):
+        data = {
+            'group_id': self.group_id,
+            'task_id': self.task_id,
+            'status': self.status
+        }
+        if depth >= 1:
+            data['task'] = self.task.to_dict(depth - 1) if self.task else None
+        return data
+
+    @classmethod
+    def materialize_statement(cls, group_ids=None, task_ids=None):
+        """INSERT ... SELECT over the groups x tasks cross join, skipping pairs that already have a status."""
+        table = cls.__table__
+        pairs = (
+            sa.select(Group.id, Task.id, sa.literal('Inactive'))
+            .join(Task, sa.true())
+            .where(~sa.exists().where(table.c.group_id == Group.id, table.c.task_id == Task.id))
+        )
+        if group_ids is not None:
+            pairs = pairs.where(Group.id.in_(group_ids))
+        if task_ids is not None:
+            pairs = pairs.where(Task.id.in_(task_ids))
+        return sa.insert(table).from_select(['group_id', 'task_id', 'status'], pairs)
+
+    @classmethod
+    def materialize(cls, group_ids=None, task_ids=None):
+        """Create every missing status (optionally limited to some groups or tasks); returns rows inserted."""
+        return db.session.execute(cls.materialize_statement(group_ids, task_ids)).rowcount
+
+    @classmethod
+    def transition(cls, to_status, task_condition, from_statuses=None):
+        """Move every status whose task matches `task_condition` to `to_status` in one UPDATE."""
+        stmt = (
+            sa.update(cls)
+            .where(cls.task_id.in_(sa.select(Task.id).where(task_condition)), cls.status != to_status)
+            .values(status=to_status)
+            .execution_options(synchronize_session=False)
+        )
+        if from_statuses is not None:
+            stmt = stmt.where(cls.status.in_(from_statuses))
+        return db.session.execute(stmt).rowcount
+
+    @classmethod
+    def activate_started(cls, now=None, task_ids=None):
+        now = now or datetime.now()
+        condition = sa.and_(Task.start_datetime <= now, Task.end_datetime > now)
+        if task_ids is not None:
+            condition = sa.and_(Task.id.in_(task_ids), condition)
+        return cls.transition('Active', condition, ['Inactive'])
+
+    @classmethod
+    def close_ended(cls, now=None, task_ids=None):
+        now = now or datetime.now()
+        condition = Task.end_datetime <= now
+        if task_ids is not None:
+            condition = sa.and_(Task.id.in_(task_ids), condition)
+        return cls.transition('Closed', condition, ['Inactive', 'Active'])
+
+
+def _note_new_group(mapper, connection, group):
+    sa.orm.object_session(group).info.setdefault('new_group_ids', []).append(group.id)
+
+
+def _note_new_task(mapper, connection, task):
+    sa.orm.object_session(task).info.setdefault('new_task_ids', []).append(task.id)
+
+
+def _materialize_new_statuses(session, flush_context):
+    # New groups get a status for every task and new tasks one for every group, in one INSERT ... SELECT
+    # per kind once the flush is done; pairs flushed with an explicit status are skipped
+    group_ids = session.info.pop('new_group_ids', None)
+    task_ids = session.info.pop('new_task_ids', None)
+    if group_ids:
+        session.execute(GroupTaskStatus.materialize_statement(group_ids=group_ids))
+    if task_ids:
+        session.execute(GroupTaskStatus.materialize_statement(task_ids=task_ids))
+
+
+# Mapper events note the new ids, so flushes that insert no Group or Task skip the INSERT ... SELECT
+sa.event.listen(Group, 'after_insert', _note_new_group)
+sa.event.listen(Task, 'after_insert', _note_new_task)
+sa.event.listen(db.session, 'after_flush', _materialize_new_statuses)
+
+
+# -----------------------------
+# Submission Models
+# -----------------------------
+class Submission(db.Model):
+    """A group's file for an upload task; the bytes live in the content-addressed store under UPLOAD_FOLDER."""
+    __tablename__ = 'submissions'
+    __table_args__ = (
+        sa.Index('ix_submissions_task_group', 'task_id', 'group_id'),
+    )
+
+    id: so.Mapped[int] = so.mapped_column(primary_key=True)
+    task_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('tasks.id'))
+    group_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('groups.id'))
+    user_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('users.id'))
+    filename: so.Mapped[str] = so.mapped_column(sa.String(255))
+    sha256: so.Mapped[str] = so.mapped_column(sa.String(64), index=True)
+    size: so.Mapped[int] = so.mapped_column(sa.BigInteger)
+    submitted_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime(), default=datetime.utcnow)
+
     def to_dict(self):
         return {
+            'id': self.id,
+            'task_id': self.task_id,
             'group_id': self.group_id,
+            'user_id': self.user_id,
+            'filename': self.filename,
+            'sha256': self.sha256,
+            'size': self.size,
+            'submitted_at': self.submitted_at
+        }
+
+
+class UploadSession(db.Model):
+    """An in-progress resumable upload; `received` bytes are already in the partial file on disk."""
+    __tablename__ = 'upload_sessions'
+
+    id: so.Mapped[str] = so.mapped_column(sa.String(32), primary_key=True)
+    task_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('tasks.id'))
+    group_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('groups.id'))
+    user_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('users.id'), index=True)
+    filename: so.Mapped[str] = so.mapped_column(sa.String(255))
+    size: so.Mapped[int] = so.mapped_column(sa.BigInteger)
+    received: so.Mapped[int] = so.mapped_column(sa.BigInteger, default=0)
+    created_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime(), default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'upload_id': self.id,
             'task_id': self.task_id,
-            'status': self.status,
-            'task': self.task.to_dict() if self.task else None
+            'filename': self.filename,
+            'size': self.size,
+            'offset': self.received
         }
 
+    @classmethod
+    def advance(cls, upload_id, offset, received):
+        """Move `received` from `offset` to `received`; returns False if another chunk got there first."""
+        result = db.session.execute(
+            sa.update(cls)
+            .where(cls.id == upload_id, cls.received == offset)
+            .values(received=received)
+        )
+        return result.rowcount == 1
+
 
 # -----------------------------
 # Message Model
 # -----------------------------
 class Message(db.Model):
     __tablename__ = 'messages'
+    __table_args__ = (
+        # Leads with group_id, so it also serves plain group_id lookups
+        sa.Index('ix_messages_group_sent_time', 'group_id', 'sent_time'),
+    )
 
     id: so.Mapped[int] = so.mapped_column(primary_key=True)
     sent_time: so.Mapped[datetime] = so.mapped_column(sa.DateTime(), index=True, default=datetime.utcnow)
     content: so.Mapped[str] = so.mapped_column(sa.String(1024))
 
-    group_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('groups.id'), index=True)
+    group_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('groups.id'))
     group: so.Mapped['Group'] = so.relationship(back_populates='message')
 
     user_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('users.id'))
@@ -151,11 +360,28 @@ class Message(db.Model):
             'username': self.user.username
         }
 
+    @staticmethod
+    def loader_options():
+        return [so.joinedload(Message.user)]
+
+    @classmethod
+    def feed(cls, group_id, before=None, limit=50):
+        """Newest `limit` messages in a group sent before the keyset cursor (sent_time, id), authors joined."""
+        query = sa.select(cls).where(cls.group_id == group_id)
+        if before is not None:
+            query = query.where(sa.tuple_(cls.sent_time, cls.id) < sa.tuple_(*before))
+        query = query.order_by(cls.sent_time.desc(), cls.id.desc()).limit(limit)
+        return db.session.scalars(query.options(*cls.loader_options())).all()
+
 
 # -----------------------------
 # UniSupport Models
 # -----------------------------
 
+class SlotUnavailable(ValueError):
+    """Raised when no appointment slot can be claimed for a booking."""
+
+
 class Student(db.Model):
     __tablename__ = 'students'
 
@@ -167,54 +393,255 @@ class Student(db.Model):
     mood_history: so.Mapped[list['MoodEntry']] = so.relationship(back_populates='student', cascade='all, delete-orphan')
     appointments: so.Mapped[list['Appointment']] = so.relationship(back_populates='student', cascade='all, delete-orphan')
 
-    def log_mood(self, score):
-        if not 1 <= score <= 5:
-            raise ValueError("Mood score must be between 1 and 5")
-        entry = MoodEntry(student=self, score=score)
+    def log_mood(self, score, notes=None, activities=None):
+        MoodEntry.check_score(score)
+        entry = MoodEntry(student=self, score=score, notes=notes, activities=activities, date=datetime.utcnow())
         db.session.add(entry)
+        db.session.flush()
+        MoodRollup.record(self.id, score, entry.date)
+        invalidate_on_commit(dashboard_key(self.id))
         return entry
 
-    def get_mood_history(self):
-        return self.mood_history
+    def get_mood_history(self, start=None, end=None, before=None, limit=None):
+        return db.session.scalars(MoodEntry.window(self.id, start, end, before, limit)).all()
+
+    def mood_average(self):
+        count, total = db.session.execute(
+            sa.select(sa.func.sum(MoodRollup.count), sa.func.sum(MoodRollup.total))
+            .where(MoodRollup.student_id == self.id, MoodRollup.period == 'week')
+        ).one()
+        return total / count if count else None
+
+    def weekly_mood(self, weeks=8, today=None):
+        """Week rollups for this calendar week and the `weeks - 1` before it, newest first; None where a week has no entries."""
+        this_week = MoodRollup.period_starts(today or datetime.utcnow())['week']
+        starts = [this_week - timedelta(weeks=i) for i in range(weeks)]
+        rollups = {
+            rollup.period_start: rollup for rollup in db.session.scalars(
+                sa.select(MoodRollup).where(
+                    MoodRollup.student_id == self.id, MoodRollup.period == 'week',
+                    MoodRollup.period_start >= starts[-1]
+                )
+            )
+        }
+        return [rollups.get(start) for start in starts]
+
+    def mood_days(self, max_days=366):
+        """Newest-first day rollups; the first one also carries the latest score and when it was logged."""
+        return db.session.scalars(MoodRollup.series(self.id, 'day', max_days)).all()
 
     def book_appointment(self, service_type, date):
         if date < datetime.now():
             raise ValueError("Cannot book appointment in the past")
-        
+
+        candidates = db.session.scalars(
+            sa.select(AppointmentSlot.id)
+            .join(AppointmentSlot.service)
+            .where(
+                SupportService.service_type == service_type,
+                AppointmentSlot.date == date,
+                AppointmentSlot.is_available.is_(True)
+            )
+            .order_by(AppointmentSlot.id)
+        ).all()
+        slot_id = next((slot_id for slot_id in candidates if AppointmentSlot.claim(slot_id)), None)
+        if slot_id is None:
+            raise SlotUnavailable("No available slot for that service at the requested time")
+
         appointment = Appointment(
             student=self,
             service_type=service_type,
             date=date,
-            status='scheduled'
+            status='scheduled',
+            slot_id=slot_id
         )
         db.session.add(appointment)
+        invalidate_on_commit(dashboard_key(self.id))
         return appointment
 
-    def get_appointments(self):
-        return self.appointments
+    def get_appointments(self, view='upcoming', status=None, after=None, limit=None, now=None):
+        return db.session.scalars(Appointment.window(self.id, view, status, after, limit, now)).all()
+
+    def upcoming_appointments(self, limit=3):
+        return self.get_appointments('upcoming', limit=limit)
 
 
 class MoodEntry(db.Model):
     __tablename__ = 'mood_entries'
+    __table_args__ = (
+        sa.Index('ix_mood_entries_student_date', 'student_id', 'date'),
+    )
 
     id: so.Mapped[int] = so.mapped_column(primary_key=True)
     student_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('students.id'))
     date: so.Mapped[datetime] = so.mapped_column(sa.DateTime(), default=datetime.utcnow)
     score: so.Mapped[int] = so.mapped_column(sa.Integer)
+    notes: so.Mapped[Optional[str]] = so.mapped_column(sa.String(500))
+    activities: so.Mapped[Optional[str]] = so.mapped_column(sa.String(32))
 
     student: so.Mapped['Student'] = so.relationship(back_populates='mood_history')
 
+    @staticmethod
+    def check_score(score):
+        if not 1 <= score <= 5:
+            raise ValueError("Mood score must be between 1 and 5")
+
+    @classmethod
+    def insert_many(cls, rows):
+        """Bulk-write validated entry dicts (student_id, score, notes, activities, date) and fold them into the rollups."""
+        db.session.execute(sa.insert(cls), rows)
+        MoodRollup.record_many([(row['student_id'], row['score'], row['date']) for row in rows])
+        for student_id in {row['student_id'] for row in rows}:
+            invalidate_on_commit(dashboard_key(student_id))
+
+    @classmethod
+    def window(cls, student_id, start=None, end=None, before=None, limit=None):
+        """Newest-first entries for one student, bounded by [start, end) and keyset cursor (date, id)."""
+        query = sa.select(cls).where(cls.student_id == student_id)
+        if start is not None:
+            query = query.where(cls.date >= start)
+        if end is not None:
+            query = query.where(cls.date < end)
+        if before is not None:
+            query = query.where(sa.tuple_(cls.date, cls.id) < sa.tuple_(*before))
+        query = query.order_by(cls.date.desc(), cls.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+
+class MoodRollup(db.Model):
+    """Per-student daily and weekly mood aggregates, kept in step with MoodEntry writes."""
+    __tablename__ = 'mood_rollups'
+
+    student_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('students.id'), primary_key=True)
+    period: so.Mapped[str] = so.mapped_column(sa.String(4), primary_key=True)
+    period_start: so.Mapped[date] = so.mapped_column(sa.Date(), primary_key=True)
+    count: so.Mapped[int] = so.mapped_column(sa.Integer)
+    total: so.Mapped[int] = so.mapped_column(sa.Integer)
+    min_score: so.Mapped[int] = so.mapped_column(sa.Integer)
+    max_score: so.Mapped[int] = so.mapped_column(sa.Integer)
+    last_score: so.Mapped[int] = so.mapped_column(sa.Integer)
+    last_date: so.Mapped[datetime] = so.mapped_column(sa.DateTime())
+
+    PERIODS = ('day', 'week')
+
+    @property
+    def average(self):
+        return self.total / self.count
+
+    @staticmethod
+    def period_starts(when):
+        day = when.date()
+        return {'day': day, 'week': day - timedelta(days=day.weekday())}
+
+    @classmethod
+    def record(cls, student_id, score, when):
+        """Fold one mood score into the day and week rollups with a single upsert per period."""
+        cls.record_many([(student_id, score, when)])
+
+    @classmethod
+    def record_many(cls, entries):
+        """Fold (student_id, score, when) tuples into the rollups: merged in Python, then one executemany upsert."""
+        rows = {}
+        for student_id, score, when in entries:
+            for period, period_start in cls.period_starts(when).items():
+                row = rows.get((student_id, period, period_start))
+                if row is None:
+                    rows[student_id, period, period_start] = {
+                        'student_id': student_id, 'period': period, 'period_start': period_start,
+                        'count': 1, 'total': score, 'min_score': score, 'max_score': score,
+                        'last_score': score, 'last_date': when,
+                    }
+                    continue
+                row['count'] += 1
+                row['total'] += score
+                row['min_score'] = min(row['min_score'], score)
+                row['max_score'] = max(row['max_score'], score)
+                if when >= row['last_date']:
+                    row['last_score'], row['last_date'] = score, when
+        if not rows:
+            return
+        table = cls.__table__
+        stmt = upsert_insert(table)
+        new = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.student_id, table.c.period, table.c.period_start],
+            set_={
+                'count': table.c.count + new.count,
+                'total': table.c.total + new.total,
+                'min_score': sa.case((new.min_score < table.c.min_score, new.min_score), else_=table.c.min_score),
+                'max_score': sa.case((new.max_score > table.c.max_score, new.max_score), else_=table.c.max_score),
+                'last_score': sa.case((new.last_date >= table.c.last_date, new.last_score), else_=table.c.last_score),
+                'last_date': sa.case((new.last_date >= table.c.last_date, new.last_date), else_=table.c.last_date),
+            }
+        )
+        db.session.execute(stmt, list(rows.values()))
+
+    @staticmethod
+    def streak(days, today=None):
+        """Number of consecutive days, ending today or yesterday, among newest-first day rollups."""
+        expected = today or datetime.utcnow().date()
+        streak = 0
+        for day in days:
+            if streak == 0 and day.period_start == expected - timedelta(days=1):
+                expected = day.period_start
+            if day.period_start != expected:
+                break
+            streak += 1
+            expected -= timedelta(days=1)
+        return streak
+
+    @classmethod
+    def series(cls, student_id, period, limit):
+        return (
+            sa.select(cls)
+            .where(cls.student_id == student_id, cls.period == period)
+            .order_by(cls.period_start.desc())
+            .limit(limit)
+        )
+
 
 class Appointment(db.Model):
     __tablename__ = 'appointments'
+    __table_args__ = (
+        sa.Index('ix_appointments_student_date', 'student_id', 'date'),
+    )
 
     id: so.Mapped[int] = so.mapped_column(primary_key=True)
     student_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('students.id'))
     service_type: so.Mapped[str] = so.mapped_column(sa.String(64))
     date: so.Mapped[datetime] = so.mapped_column(sa.DateTime())
     status: so.Mapped[str] = so.mapped_column(sa.String(32), default='scheduled')
+    slot_id: so.Mapped[Optional[int]] = so.mapped_column(sa.ForeignKey('appointment_slots.id'), unique=True)
 
     student: so.Mapped['Student'] = so.relationship(back_populates='appointments')
+    slot: so.Mapped[Optional['AppointmentSlot']] = so.relationship()
+
+    VIEWS = ('upcoming', 'past')
+
+    @classmethod
+    def window(cls, student_id, view='upcoming', status=None, after=None, limit=None, now=None):
+        """One student's appointments on one side of `now`, ordered away from it and keyset-paged by (date, id).
+
+        Upcoming appointments are soonest first and past ones most recent first, so both views
+        read a contiguous range of the (student_id, date) index.
+        """
+        now = now or datetime.now()
+        query = sa.select(cls).where(cls.student_id == student_id)
+        if status is not None:
+            query = query.where(cls.status == status)
+        if view == 'past':
+            query = query.where(cls.date <= now).order_by(cls.date.desc(), cls.id.desc())
+            if after is not None:
+                query = query.where(sa.tuple_(cls.date, cls.id) < sa.tuple_(*after))
+        else:
+            query = query.where(cls.date > now).order_by(cls.date, cls.id)
+            if after is not None:
+                query = query.where(sa.tuple_(cls.date, cls.id) > sa.tuple_(*after))
+        if limit is not None:
+            query = query.limit(limit)
+        return query
 
 
 class SupportService(db.Model):
@@ -222,30 +649,89 @@ class SupportService(db.Model):
 
     id: so.Mapped[int] = so.mapped_column(primary_key=True)
     name: so.Mapped[str] = so.mapped_column(sa.String(64))
-    service_type: so.Mapped[str] = so.mapped_column(sa.String(64))
+    service_type: so.Mapped[str] = so.mapped_column(sa.String(64), index=True)
+    description: so.Mapped[Optional[str]] = so.mapped_column(sa.String(256))
+    duration: so.Mapped[int] = so.mapped_column(sa.Integer, default=60)
+    # Weekly schedule template: comma-separated weekdays (Monday=0) and opening hours
+    weekdays: so.Mapped[str] = so.mapped_column(sa.String(16), default='0,1,2,3,4')
+    opening_hour: so.Mapped[int] = so.mapped_column(sa.Integer, default=9)
+    closing_hour: so.Mapped[int] = so.mapped_column(sa.Integer, default=17)
+    slots_generated_until: so.Mapped[Optional[datetime]] = so.mapped_column(sa.DateTime())
     available_slots: so.Mapped[list['AppointmentSlot']] = so.relationship(back_populates='service', cascade='all, delete-orphan')
 
-    def __init__(self, name: str, service_type: str):
+    def __init__(self, name: str, service_type: str, description: Optional[str] = None, duration: int = 60,
+                 weekdays: str = '0,1,2,3,4', opening_hour: int = 9, closing_hour: int = 17):
         self.name = name
         self.service_type = service_type
-
-    def generate_available_slots(self):
-        slots = []
-        current_date = datetime.now()
-        for _ in range(14):  # Generate slots for next 14 days
-            current_date += timedelta(days=1)
-            if current_date.weekday() < 5:  # Only weekdays
-                for hour in range(9, 17):  # 9 AM to 5 PM
-                    slot = AppointmentSlot(
-                        service=self,
-                        date=current_date.replace(hour=hour, minute=0)
-                    )
-                    slots.append(slot)
-        return slots
+        self.description = description
+        self.duration = duration
+        self.weekdays = weekdays
+        self.opening_hour = opening_hour
+        self.closing_hour = closing_hour
+
+    def slot_times(self, start, end):
+        """Start times in [start, end) produced by this service's weekly schedule template."""
+        weekdays = {int(day) for day in self.weekdays.split(',') if day.strip()}
+        length = timedelta(minutes=self.duration or 60)
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end:
+            if day.weekday() in weekdays:
+                slot = day.replace(hour=self.opening_hour)
+                closing = day.replace(hour=self.closing_hour)
+                while slot + length <= closing:
+                    if start <= slot < end:
+                        yield slot
+                    slot += length
+            day += timedelta(days=1)
+
+    @classmethod
+    def extend_slots(cls, until, services=None, batch_size=5000):
+        """Extend each service's slot horizon up to `until` with batched, idempotent inserts.
+
+        Generation resumes from the service's slots_generated_until watermark, and rows that already
+        exist are skipped by the (service_id, date) unique constraint, so re-running is cheap and safe.
+        Returns the number of slots inserted.
+        """
+        services = services if services is not None else db.session.scalars(sa.select(cls)).all()
+        stmt = upsert_insert(AppointmentSlot.__table__).on_conflict_do_nothing(
+            index_elements=['service_id', 'date']
+        )
+        now = datetime.now().replace(minute=0, second=0, microsecond=0)
+        inserted = 0
+        batch = []
+        for service in services:
+            start = max(service.slots_generated_until or now, now)
+            if start >= until:
+                continue
+            if service.id is None:
+                db.session.flush()
+            batch.extend(
+                {'service_id': service.id, 'date': date, 'is_available': True}
+                for date in service.slot_times(start, until)
+            )
+            service.slots_generated_until = until
+            if len(batch) >= batch_size:
+                inserted += db.session.execute(stmt, batch).rowcount
+                batch = []
+        if batch:
+            inserted += db.session.execute(stmt, batch).rowcount
+        return inserted
+
+
+def _invalidate_services(mapper, connection, target):
+    invalidate_on_commit(SERVICES_KEY)
+
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    sa.event.listen(SupportService, _event, _invalidate_services)
 
 
 class AppointmentSlot(db.Model):
     __tablename__ = 'appointment_slots'
+    __table_args__ = (
+        sa.Index('ix_appointment_slots_service_available_date', 'service_id', 'is_available', 'date'),
+        sa.UniqueConstraint('service_id', 'date', name='uq_appointment_slots_service_date'),
+    )
 
     id: so.Mapped[int] = so.mapped_column(primary_key=True)
     service_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey('support_services.id'))
@@ -253,3 +739,40 @@ class AppointmentSlot(db.Model):
     is_available: so.Mapped[bool] = so.mapped_column(default=True)
 
     service: so.Mapped['SupportService'] = so.relationship(back_populates='available_slots')
+
+    @classmethod
+    def next_available(cls, service_id, start=None, end=None, after=None, limit=20):
+        """Free slots for one service in date order, answered from the covering index alone."""
+        query = (
+            sa.select(cls.id, cls.service_id, cls.date)
+            .where(cls.service_id == service_id, cls.is_available.is_(True), cls.date >= (start or datetime.now()))
+        )
+        if end is not None:
+            query = query.where(cls.date < end)
+        if after is not None:
+            query = query.where(sa.tuple_(cls.date, cls.id) > sa.tuple_(*after))
+        return db.session.execute(query.order_by(cls.date, cls.id).limit(limit)).all()
+
+    @classmethod
+    def search(cls, service_type, start=None, end=None, after=None, limit=20):
+        """Next `limit` free slots across every service of a type, after the keyset cursor (date, id).
+
+        Each service is read with its own bounded index range scan and the sorted streams are merged,
+        so the cost depends on the number of services and `limit`, not on how many slots exist.
+        """
+        service_ids = db.session.scalars(
+            sa.select(SupportService.id).where(SupportService.service_type == service_type)
+        ).all()
+        streams = [cls.next_available(service_id, start, end, after, limit) for service_id in service_ids]
+        return list(heapq.merge(*streams, key=lambda slot: (slot.date, slot.id)))[:limit]
+
+    @classmethod
+    def claim(cls, slot_id):
+        """Atomically mark a slot as booked; returns False if another booking claimed it first."""
+        result = db.session.execute(
+            sa.update(cls)
+            .where(cls.id == slot_id, cls.is_available.is_(True))
+            .values(is_available=False)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
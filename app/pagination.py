@@ -0,0 +1,17 @@
+from datetime import datetime
+
+
+def encode_cursor(when, row_id):
+    """Encode a (datetime, id) keyset position as an opaque URL-safe string."""
+    return f'{when.isoformat()}_{row_id}'
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, returning None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        when, row_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(when), int(row_id)
+    except ValueError:
+        return None
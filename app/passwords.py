@@ -0,0 +1,102 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+def _hash(password, method, salt_length):
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+def _verify(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+
+class PasswordHasher:
+    """Runs password hashing in a bounded process pool so request threads only wait on the result.
+
+    At most `max_pending` jobs are queued at once; further callers block until a slot frees up,
+    which keeps a login storm from building an unbounded backlog; with workers=0 they run inline.
+    hash_many spreads a batch over a separate pool of `batch_workers` processes, started on the
+    first batch and reused by later ones, so a chunked roster import forks it only once.
+    """
+
+    def __init__(self, method, salt_length=16, workers=0, max_pending=None, batch_workers=None):
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self.batch_workers = batch_workers or os.cpu_count() or 1
+        self.method_prefix = None
+        self.slots = threading.BoundedSemaphore(max_pending or max(workers, 1) * 4)
+        self.pool = None
+        self.batch_pool = None
+        self.pool_lock = threading.Lock()
+
+    def _executor(self):
+        with self.pool_lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+                atexit.register(self.pool.shutdown)
+            return self.pool
+
+    def _batch_executor(self):
+        with self.pool_lock:
+            if self.batch_pool is None:
+                self.batch_pool = ProcessPoolExecutor(max_workers=self.batch_workers)
+                atexit.register(self.batch_pool.shutdown)
+            return self.batch_pool
+
+    def _call(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        with self.slots:
+            return self._executor().submit(func, *args).result()
+
+    def hash(self, password):
+        return self._call(_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        if not pwhash:
+            return False
+        return self._call(_verify, pwhash, password)
+
+    def hash_many(self, passwords, chunksize=4):
+        """Hash a batch of passwords in parallel across the pool, preserving order."""
+        passwords = list(passwords)
+        count = len(passwords)
+        if self.batch_workers < 2 or count < 2:
+            return [_hash(password, self.method, self.salt_length) for password in passwords]
+        args = (_hash, passwords, [self.method] * count, [self.salt_length] * count)
+        return list(self._batch_executor().map(*args, chunksize=chunksize))
+
+    def needs_rehash(self, pwhash):
+        """True when a stored hash was made with different cost parameters than the configured ones."""
+        if self.method_prefix is None:
+            # Werkzeug fills in default cost parameters ('scrypt' is stored as 'scrypt:32768:8:1'),
+            # so compare against the prefix it actually writes for the configured method
+            self.method_prefix = _hash('', self.method, 1).split('$', 1)[0]
+        return bool(pwhash) and pwhash.split('$', 1)[0] != self.method_prefix
+
+    def shutdown(self):
+        with self.pool_lock:
+            for pool in (self.pool, self.batch_pool):
+                if pool is not None:
+                    pool.shutdown()
+            self.pool = self.batch_pool = None
+
+
+def get_hasher():
+    return current_app.extensions['password_hasher']
+
+
+def init_app(app):
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'],
+        salt_length=app.config['PASSWORD_HASH_SALT_LENGTH'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+        batch_workers=app.config['PASSWORD_HASH_BATCH_WORKERS']
+    )
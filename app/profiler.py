@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+import time
+from collections import Counter
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+
+from app import db
+
+logger = logging.getLogger('app.profiler')
+
+
+class RequestProfile:
+    """SQL statements, timings and repeat counts collected for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, elapsed):
+        self.query_count += 1
+        self.db_time += elapsed
+        self.statements[' '.join(statement.split())] += 1
+
+    def repeated(self, threshold):
+        """SELECT statements issued at least `threshold` times, the usual N+1 signature."""
+        return {
+            statement: count for statement, count in self.statements.most_common()
+            if count >= threshold and statement.upper().startswith('SELECT')
+        }
+
+    def to_dict(self, endpoint, status, threshold):
+        repeated = self.repeated(threshold)
+        return {
+            'endpoint': endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': status,
+            'queries': self.query_count,
+            'db_ms': round(self.db_time * 1000, 3),
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'n_plus_one': bool(repeated),
+            'repeated': repeated
+        }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context rather than the pooled connection, so a statement that
+    # raises (and never reaches after_cursor_execute) leaves nothing behind to skew later timings
+    if context is not None:
+        context.profiler_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'profiler_started', None)
+    if started is None:
+        return
+    profile = g.get('sql_profile') if has_app_context() else None
+    if profile is not None:
+        profile.record(statement, time.perf_counter() - started)
+
+
+def _start_profile():
+    g.sql_profile = RequestProfile()
+
+
+def _finish_profile(response):
+    profile = g.pop('sql_profile', None)
+    if profile is None:
+        return response
+    threshold = current_app.config['SQL_PROFILER_N_PLUS_ONE_THRESHOLD']
+    entry = profile.to_dict(request.endpoint, response.status_code, threshold)
+    response.headers['X-SQL-Profile'] = f"queries={entry['queries']}; db_ms={entry['db_ms']}; n_plus_one={int(entry['n_plus_one'])}"
+    line = json.dumps(entry)
+    logger.info(line)
+    log_path = current_app.config['SQL_PROFILER_LOG']
+    if log_path:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        with open(log_path, 'a') as log:
+            log.write(line + '\n')
+    return response
+
+
+def init_app(app):
+    """Attach the SQL profiler to `app` when SQL_PROFILER_ENABLED is set."""
+    if not app.config['SQL_PROFILER_ENABLED']:
+        return
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+
+
+def load_profile_log(path):
+    with open(path) as log:
+        for line in log:
+            if line.strip():
+                yield json.loads(line)
+
+
+def aggregate(entries):
+    """Per-endpoint request count, query and DB-time statistics and the most repeated statements."""
+    endpoints = {}
+    for entry in entries:
+        stats = endpoints.setdefault(entry['endpoint'] or entry['path'], {
+            'requests': 0, 'queries': [], 'db_ms': [], 'n_plus_one': 0, 'repeated': Counter()
+        })
+        stats['requests'] += 1
+        stats['queries'].append(entry['queries'])
+        stats['db_ms'].append(entry['db_ms'])
+        stats['n_plus_one'] += entry['n_plus_one']
+        stats['repeated'].update(entry['repeated'])
+
+    report = {}
+    for endpoint, stats in endpoints.items():
+        queries = sorted(stats['queries'])
+        report[endpoint] = {
+            'requests': stats['requests'],
+            'avg_queries': round(sum(queries) / len(queries), 2),
+            'max_queries': queries[-1],
+            'p95_queries': queries[max(int(len(queries) * 0.95) - 1, 0)],
+            'avg_db_ms': round(sum(stats['db_ms']) / len(stats['db_ms']), 3),
+            'n_plus_one_requests': stats['n_plus_one'],
+            'top_repeated': stats['repeated'].most_common(3)
+        }
+    return report
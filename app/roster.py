@@ -0,0 +1,218 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import User, Student
+from app.passwords import get_hasher
+
+
+ERROR_FIELDS = ('line', 'username', 'email', 'student_id', 'error')
+TEXT_FIELDS = ('username', 'email', 'role', 'name', 'password')
+
+
+def iter_roster(path, fmt=None):
+    """Stream (line number, row) pairs from a CSV or JSON Lines roster without loading the file.
+
+    A JSON line that does not parse is yielded as its JSONDecodeError, so _clean can reject it
+    like any other bad row instead of aborting the import.
+    """
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    with open(path, newline='', encoding='utf-8') as handle:
+        if fmt == 'csv':
+            reader = csv.DictReader(handle)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as error:
+                    yield line_no, error
+
+
+def _clean(line_no, row):
+    """Normalise one roster row, returning (values, error message)."""
+    if isinstance(row, json.JSONDecodeError):
+        return None, f'invalid JSON: {row.msg}'
+    if not isinstance(row, dict):
+        return None, 'row must be a JSON object'
+    # JSON Lines values can be any type; CSV values are always strings
+    for field in TEXT_FIELDS:
+        if row.get(field) is not None and not isinstance(row[field], str):
+            return None, f'{field} must be a string'
+    username = (row.get('username') or '').strip()
+    email = (row.get('email') or '').strip()
+    student_id = row.get('student_id')
+    role = (row.get('role') or 'Student').strip()
+    if not username or len(username) > 64:
+        return None, 'username is required and must be at most 64 characters'
+    if '@' not in email or len(email) > 120:
+        return None, 'email is missing or invalid'
+    if len(role) > 10:
+        return None, 'role must be at most 10 characters'
+    if student_id in (None, ''):
+        student_id = None
+    elif isinstance(student_id, bool) or (isinstance(student_id, float) and not student_id.is_integer()):
+        return None, 'student_id must be an integer'
+    else:
+        try:
+            student_id = int(student_id)
+        except (TypeError, ValueError):
+            return None, 'student_id must be an integer'
+    return {
+        'line': line_no,
+        'username': username,
+        'email': email,
+        'student_id': student_id,
+        'role': role,
+        'name': (row.get('name') or username).strip()[:64],
+        'password': row.get('password') or None,
+    }, None
+
+
+class RosterImport:
+    """Provision User and Student rows from a roster file in committed chunks.
+
+    Each chunk is validated, checked for username/email/student_id clashes with one IN query
+    per field, and bulk inserted. Progress (rows consumed so far) is saved after every commit,
+    so an interrupted import picks up at the next chunk. Rejected rows go to a CSV error report.
+    """
+
+    def __init__(self, path, fmt=None, chunk_size=1000, progress_path=None, error_path=None):
+        self.path = path
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.progress_path = progress_path or path + '.progress.json'
+        self.error_path = error_path or path + '.errors.csv'
+        self.stats = {'processed': 0, 'inserted': 0, 'rejected': 0}
+
+    def load_progress(self):
+        if not os.path.exists(self.progress_path):
+            return dict(self.stats)
+        with open(self.progress_path) as handle:
+            return json.load(handle)
+
+    def save_progress(self):
+        tmp_path = self.progress_path + '.tmp'
+        with open(tmp_path, 'w') as handle:
+            json.dump(self.stats, handle)
+        os.replace(tmp_path, self.progress_path)
+
+    def _taken(self, column, values):
+        values = [value for value in values if value is not None]
+        if not values:
+            return set()
+        return set(db.session.scalars(db.select(column).where(column.in_(values))))
+
+    def _validate(self, chunk):
+        """Split a chunk into insertable rows and (line, row, error) rejects."""
+        accepted, rejected, cleaned = [], [], []
+        for line_no, row in chunk:
+            values, error = _clean(line_no, row)
+            if error:
+                rejected.append((line_no, row, error))
+            else:
+                cleaned.append(values)
+
+        # One IN query per unique column; values accepted earlier in this chunk join the sets
+        taken = {
+            'username': self._taken(User.username, [values['username'] for values in cleaned]),
+            'email': self._taken(User.email, [values['email'] for values in cleaned]),
+            'student_id': self._taken(User.student_id, [values['student_id'] for values in cleaned]),
+        }
+        for values in cleaned:
+            clash = next((field for field in taken if values[field] is not None and values[field] in taken[field]), None)
+            if clash:
+                rejected.append((values['line'], values, f'{clash} already exists'))
+                continue
+            for field in taken:
+                if values[field] is not None:
+                    taken[field].add(values[field])
+            accepted.append(values)
+        return accepted, rejected
+
+    def _insert(self, rows):
+        passwords = [row['password'] for row in rows if row['password']]
+        hashes = iter(get_hasher().hash_many(passwords)) if passwords else iter(())
+        user_rows = [{
+            'username': row['username'],
+            'email': row['email'],
+            'student_id': row['student_id'],
+            'role': row['role'],
+            'password_hash': next(hashes) if row['password'] else None,
+            'registered': bool(row['password']),
+        } for row in rows]
+        user_ids = db.session.scalars(
+            db.insert(User).returning(User.id, sort_by_parameter_order=True), user_rows
+        ).all()
+        db.session.execute(db.insert(Student), [
+            {'user_id': user_id, 'name': row['name']} for user_id, row in zip(user_ids, rows)
+        ])
+
+    def _insert_one_by_one(self, rows):
+        """Fallback when a concurrent writer claimed a value between the check and the insert."""
+        inserted, rejected = [], []
+        for values in rows:
+            try:
+                with db.session.begin_nested():
+                    self._insert([values])
+                inserted.append(values)
+            except IntegrityError:
+                rejected.append((values['line'], values, 'conflicts with a concurrently created user'))
+        return inserted, rejected
+
+    def _write_errors(self, writer, rejected):
+        for line_no, row, error in sorted(rejected, key=lambda item: item[0] or 0):
+            row = row if isinstance(row, dict) else {}
+            writer.writerow({
+                'line': line_no,
+                'username': row.get('username'),
+                'email': row.get('email'),
+                'student_id': row.get('student_id'),
+                'error': error,
+            })
+
+    def run(self, restart=False, report=None):
+        """Import the roster, resuming from saved progress unless `restart` is set."""
+        if restart:
+            for stale in (self.progress_path, self.error_path):
+                if os.path.exists(stale):
+                    os.remove(stale)
+        self.stats = self.load_progress()
+        rows = islice(iter_roster(self.path, self.fmt), self.stats['processed'], None)
+
+        new_report = not os.path.exists(self.error_path)
+        with open(self.error_path, 'a', newline='', encoding='utf-8') as error_file:
+            writer = csv.DictWriter(error_file, fieldnames=ERROR_FIELDS)
+            if new_report:
+                writer.writeheader()
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                accepted, rejected = self._validate(chunk)
+                try:
+                    if accepted:
+                        self._insert(accepted)
+                    db.session.commit()
+                except IntegrityError:
+                    db.session.rollback()
+                    accepted, conflicts = self._insert_one_by_one(accepted)
+                    db.session.commit()
+                    rejected += conflicts
+                self._write_errors(writer, rejected)
+                error_file.flush()
+
+                self.stats['processed'] += len(chunk)
+                self.stats['inserted'] += len(accepted)
+                self.stats['rejected'] += len(rejected)
+                self.save_progress()
+                if report:
+                    report(self.stats)
+        return self.stats
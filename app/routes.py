@@ -1,25 +1,99 @@
-from flask import render_template, request, redirect, url_for, flash
+from flask import render_template, stream_template, stream_with_context, request, redirect, url_for, flash, current_app, jsonify, abort, Response, send_file
 from flask_login import current_user, login_user, logout_user, login_required
-from datetime import datetime
-from flask import Blueprint
+from datetime import datetime, timedelta
+import time
+import uuid
+from flask import Blueprint, g
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import secure_filename
 
 from app import db
-from app.models import User, Student, SupportService, MoodEntry, Appointment
+from app.models import User, Student, MoodRollup, SupportService, AppointmentSlot, Appointment, Message, Task, Submission, UploadSession
 from app.forms import LoginForm, RegisterForm, MoodLogForm, AppointmentForm
+from app.pagination import encode_cursor, decode_cursor
+from app.transactions import run_in_transaction
+from app.cache import SERVICES_KEY, dashboard_key, get_cache, get_or_set
+from app.uploads import UploadBusy, UploadTooLarge, get_store
+from app.write_behind import get_mood_queue
 
 bp = Blueprint('main', __name__)
 
-# Temporary storage (will be replaced with database)
-support_services = [
-    SupportService("Counselling Service", "counselling"),
-    SupportService("Academic Support", "academic"),
-    SupportService("Wellbeing Workshop", "workshop")
-]
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d') if value else None
+    except ValueError:
+        return None
+
+def _parse_end_date(value):
+    """Exclusive upper bound for an inclusive ?end=YYYY-MM-DD: midnight after that day."""
+    end = _parse_date(value)
+    return end + timedelta(days=1) if end else None
+
+def _current_student(create=False):
+    """The logged-in user's Student profile, cached on flask.g for the rest of the request.
+
+    The profile is eager-loaded with the user by load_user, so this normally issues no query.
+    With create=True a missing profile is created and committed.
+    """
+    if g.get('student') is None:
+        student = current_user.student_profile
+        if student is None and create:
+            student = Student(user_id=current_user.id, name=current_user.username)
+            db.session.add(student)
+            db.session.commit()
+        g.student = student
+    return g.student
+
+def _service_list():
+    return get_or_set(SERVICES_KEY, lambda: [
+        {'id': service.id, 'name': service.name, 'service_type': service.service_type,
+         'description': service.description, 'duration': service.duration}
+        for service in SupportService.query.order_by(SupportService.name)
+    ])
+
+def _dashboard_view(student):
+    """Everything the dashboard shows for one student, pre-formatted for the template.
+
+    `version` changes every time the view model is rebuilt, so the template's fragment cache
+    key follows the same invalidation as the view model itself.
+    """
+    # The newest day rollup doubles as the latest entry, saving a query on mood_entries
+    days = student.mood_days()
+    latest = days[0] if days else None
+    weekly = [week.average if week else None for week in student.weekly_mood(2)]
+    return {
+        'version': time.time_ns(),
+        'latest_mood': {'score': latest.last_score, 'date': latest.last_date.strftime('%Y-%m-%d %H:%M')}
+        if latest else None,
+        'mood_average': student.mood_average(),
+        'weekly_mood': weekly,
+        'weekly_change': weekly[0] - weekly[1] if None not in weekly else None,
+        'mood_streak': MoodRollup.streak(days),
+        'upcoming_appointments': [
+            {'service_type': appointment.service_type, 'date': appointment.date.strftime('%Y-%m-%d %H:%M'),
+             'status': appointment.status}
+            for appointment in student.upcoming_appointments(3)
+        ]
+    }
+
+def _render_dashboard():
+    student = _current_student()
+    view = {'version': None, 'latest_mood': None, 'mood_average': None, 'weekly_mood': [], 'weekly_change': None,
+            'mood_streak': 0, 'upcoming_appointments': []}
+    if student:
+        view = get_or_set(dashboard_key(student.id), lambda: _dashboard_view(student))
+    return render_template(
+        'dashboard.html',
+        title='Dashboard',
+        user=current_user,
+        support_services=_service_list(),
+        **view
+    )
 
 @bp.route('/')
 def index():
     if current_user.is_authenticated:
-        return render_template('dashboard.html', title='Dashboard', user=current_user)
+        return _render_dashboard()
     return render_template('index.html', title='Welcome to UniSupport')
 
 @bp.route('/register', methods=['GET', 'POST'])
@@ -35,7 +109,13 @@ def register():
         )
         user.set_password(form.password.data)
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent signup won the race for this username or email
+            db.session.rollback()
+            form.add_taken_errors(User.taken_fields(form.username.data, form.email.data) or {'username'})
+            return render_template('register.html', title='Register', form=form)
         flash('Registration successful. Please log in.', 'success')
         return redirect(url_for('main.login'))
     return render_template('register.html', title='Register', form=form)
@@ -48,6 +128,10 @@ def login():
     if form.validate_on_submit():
         user = User.query.filter_by(username=form.username.data).first()
         if user and user.check_password(form.password.data):
+            if user.password_needs_rehash():
+                # Upgrade hashes made with older cost parameters while we have the plaintext
+                user.set_password(form.password.data)
+                db.session.commit()
             login_user(user, remember=form.remember_me.data)
             return redirect(url_for('main.dashboard'))
         flash('Invalid username or password', 'error')
@@ -62,7 +146,7 @@ def logout():
 @bp.route('/dashboard')
 @login_required
 def dashboard():
-    return render_template('dashboard.html', title='Dashboard', user=current_user)
+    return _render_dashboard()
 
 @bp.route('/mood/log', methods=['GET', 'POST'])
 @login_required
@@ -70,24 +154,32 @@ def log_mood():
     form = MoodLogForm()
     if form.validate_on_submit():
         try:
-            # Create or get student record
-            student = Student.query.filter_by(user_id=current_user.id).first()
-            if not student:
-                student = Student(user_id=current_user.id, name=current_user.username)
-                db.session.add(student)
-            
-            # Create mood entry
-            entry = MoodEntry(
-                student=student,
-                score=int(form.score.data),
-                notes=form.notes.data,
-                activities=form.activities.data
-            )
-            db.session.add(entry)
-            db.session.commit()
+            student = _current_student(create=True)
+            queue = get_mood_queue()
+            if queue is not None:
+                # Hand the connection back first: a request holding a pool slot or read lock while it
+                # waits would stall the writer's group commit
+                student_id = student.id
+                db.session.close()
+                # Written with other queued entries in the next group commit
+                queue.log(student_id, int(form.score.data), notes=form.notes.data,
+                          activities=form.activities.data)
+                if queue.durability == 'queued':
+                    # Acknowledged before the entry is committed; it reaches the dashboard with its batch
+                    flash('Mood received! It will appear on your dashboard in a moment.', 'success')
+                    return redirect(url_for('main.dashboard'))
+            else:
+                # Create mood entry and update rollups in the same transaction
+                student.log_mood(
+                    int(form.score.data),
+                    notes=form.notes.data,
+                    activities=form.activities.data
+                )
+                db.session.commit()
             flash('Mood logged successfully!', 'success')
             return redirect(url_for('main.dashboard'))
         except Exception as e:
+            db.session.rollback()
             flash(f'Error logging mood: {str(e)}', 'error')
     
     return render_template('log_mood.html', title='Log Mood', form=form)
@@ -97,53 +189,322 @@ def log_mood():
 def book_appointment():
     form = AppointmentForm()
     # Get available services for the form
-    services = SupportService.query.all()
-    form.service_type.choices = [(s.service_type, s.name) for s in services]
+    services = _service_list()
+    form.service_type.choices = [(s['service_type'], s['name']) for s in services]
+    open_slots = {
+        service['id']: AppointmentSlot.next_available(service['id'], limit=current_app.config['BOOKING_PAGE_SLOTS'])
+        for service in services
+    }
     
     if form.validate_on_submit():
         try:
-            # Create or get student record
-            student = Student.query.filter_by(user_id=current_user.id).first()
-            if not student:
-                student = Student(user_id=current_user.id, name=current_user.username)
-                db.session.add(student)
-            
-            # Create appointment
-            appointment = Appointment(
-                student=student,
-                service_type=form.service_type.data,
-                date=datetime.strptime(form.date.data, '%Y-%m-%d %H:%M'),
-                status='scheduled'
-            )
-            db.session.add(appointment)
-            db.session.commit()
+            date = datetime.strptime(form.date.data.replace('T', ' '), '%Y-%m-%d %H:%M')
+
+            student = _current_student(create=True)
+            # Claim a free slot and create the appointment; retried as a unit on lock errors
+            run_in_transaction(lambda: student.book_appointment(form.service_type.data, date))
             flash('Appointment booked successfully!', 'success')
             return redirect(url_for('main.dashboard'))
         except Exception as e:
             flash(f'Error booking appointment: {str(e)}', 'error')
     
-    return render_template('book_appointment.html', title='Book Appointment', form=form, services=services)
+    return render_template('book_appointment.html', title='Book Appointment', form=form, services=services,
+                           open_slots=open_slots)
+
+@bp.route('/appointments/slots')
+@login_required
+def slot_search():
+    service_type = request.args.get('service_type')
+    if not service_type:
+        abort(400)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    slots = AppointmentSlot.search(
+        service_type,
+        start=max(_parse_date(request.args.get('start')) or datetime.now(), datetime.now()),
+        end=_parse_end_date(request.args.get('end')),
+        after=decode_cursor(request.args.get('after')),
+        limit=limit
+    )
+    next_cursor = encode_cursor(slots[-1].date, slots[-1].id) if len(slots) == limit else None
+    return jsonify({
+        'slots': [
+            {'id': slot.id, 'service_id': slot.service_id, 'date': slot.date.isoformat()}
+            for slot in slots
+        ],
+        'next_cursor': next_cursor
+    })
+
+def _require_group_member(group_id):
+    if current_user.group_id != group_id and not current_user.is_staff:
+        abort(403)
+
+@bp.route('/groups/<int:group_id>/messages')
+@login_required
+def group_messages(group_id):
+    _require_group_member(group_id)
+    limit = min(max(request.args.get('limit', current_app.config['MESSAGE_FEED_PAGE_SIZE'], type=int), 1), 200)
+    messages = Message.feed(group_id, before=decode_cursor(request.args.get('before')), limit=limit)
+    next_cursor = encode_cursor(messages[-1].sent_time, messages[-1].id) if len(messages) == limit else None
+    return jsonify({'messages': [message.to_dict() for message in messages], 'next_cursor': next_cursor})
+
+@bp.route('/groups/<int:group_id>/messages', methods=['POST'])
+@login_required
+def send_group_message(group_id):
+    _require_group_member(group_id)
+    content = (request.get_json(silent=True) or request.form).get('content', '').strip()
+    if not content or len(content) > 1024:
+        abort(400)
+    message = Message(group_id=group_id, user=current_user, content=content)
+    db.session.add(message)
+    # Subscribers are notified by the broker once this commit succeeds
+    db.session.commit()
+    return jsonify(message.to_dict()), 201
+
+def _upload_task(task_id):
+    task = db.get_or_404(Task, task_id)
+    if not task.isUpload:
+        abort(404)
+    if current_user.group_id is None:
+        abort(403)
+    return task
+
+def _submission_filename(name):
+    return secure_filename(name or '')[:255] or 'submission'
+
+def _create_submission(task_id, filename, digest, size):
+    submission = Submission(task_id=task_id, group_id=current_user.group_id, user_id=current_user.id,
+                            filename=filename, sha256=digest, size=size)
+    db.session.add(submission)
+    return submission
+
+@bp.route('/tasks/<int:task_id>/submission', methods=['PUT'])
+@login_required
+def upload_submission(task_id):
+    """Single-request upload: the raw body is streamed to disk, bounded by MAX_CONTENT_LENGTH."""
+    _upload_task(task_id)
+    try:
+        digest, size = get_store().save_stream(request.stream, current_app.config['MAX_CONTENT_LENGTH'])
+    except UploadTooLarge:
+        abort(413)
+    submission = _create_submission(task_id, _submission_filename(request.args.get('filename')), digest, size)
+    db.session.commit()
+    return jsonify(submission.to_dict()), 201
+
+@bp.route('/tasks/<int:task_id>/uploads', methods=['POST'])
+@login_required
+def start_upload(task_id):
+    """Open a resumable upload for a file of a declared size; chunks are then PATCHed to it."""
+    _upload_task(task_id)
+    data = request.get_json(silent=True) or {}
+    size = data.get('size')
+    if not isinstance(size, int) or size < 0:
+        abort(400)
+    if size > current_app.config['UPLOAD_MAX_FILE_SIZE']:
+        abort(413)
+    upload = UploadSession(id=uuid.uuid4().hex, task_id=task_id, group_id=current_user.group_id,
+                           user_id=current_user.id, filename=_submission_filename(data.get('filename')), size=size)
+    db.session.add(upload)
+    get_store().start(upload.id)
+    db.session.commit()
+    return jsonify(upload.to_dict()), 201, {'Location': url_for('main.upload_status', upload_id=upload.id)}
+
+def _own_upload(upload_id):
+    upload = db.get_or_404(UploadSession, upload_id)
+    if upload.user_id != current_user.id:
+        abort(404)
+    return upload
+
+@bp.route('/uploads/<upload_id>')
+@login_required
+def upload_status(upload_id):
+    """Where to resume: the offset is also sent as an Upload-Offset header, so HEAD works too."""
+    upload = _own_upload(upload_id)
+    return jsonify(upload.to_dict()), {'Upload-Offset': str(upload.received)}
+
+def _offset_conflict(upload):
+    # Client and server disagree on progress; tell it where to resume from
+    return jsonify(upload.to_dict()), 409, {'Upload-Offset': str(upload.received)}
+
+@bp.route('/uploads/<upload_id>', methods=['PATCH'])
+@login_required
+def upload_chunk(upload_id):
+    """Append the request body at the Upload-Offset header; completes the upload on the last byte.
+
+    One chunk per upload is written at a time (the partial file is locked), progress is re-read
+    under that lock, and `received` only moves with a conditional UPDATE, so a duplicate or
+    concurrent PATCH at the same offset gets 409 instead of appending twice.
+    """
+    upload = _own_upload(upload_id)
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset != upload.received:
+        return _offset_conflict(upload)
+    store = get_store()
+    try:
+        with store.locked(upload_id):
+            # Re-read in a fresh transaction: another chunk may have landed since the check above
+            db.session.commit()
+            upload = _own_upload(upload_id)
+            if offset != upload.received:
+                return _offset_conflict(upload)
+            size = upload.size
+            # No transaction stays open while the body streams in
+            db.session.commit()
+            received = store.append(upload_id, request.stream, offset, size)
+            if not UploadSession.advance(upload_id, offset, received):
+                db.session.rollback()
+                return _offset_conflict(db.get_or_404(UploadSession, upload_id))
+            if received < size:
+                db.session.commit()
+                return jsonify(upload.to_dict()), 200, {'Upload-Offset': str(upload.received)}
+            digest = store.finish(upload_id, size)
+            submission = _create_submission(upload.task_id, upload.filename, digest, size)
+            db.session.delete(upload)
+            db.session.commit()
+            return jsonify(submission.to_dict()), 201
+    except UploadBusy:
+        return _offset_conflict(upload)
+    except UploadTooLarge:
+        abort(413)
+
+@bp.route('/uploads/<upload_id>', methods=['DELETE'])
+@login_required
+def cancel_upload(upload_id):
+    upload = _own_upload(upload_id)
+    db.session.delete(upload)
+    db.session.commit()
+    get_store().discard(upload_id)
+    return '', 204
+
+@bp.route('/submissions/<int:submission_id>/download')
+@login_required
+def download_submission(submission_id):
+    """Served with send_file so range requests, conditional GETs and wsgi.file_wrapper/X-Sendfile apply."""
+    submission = db.get_or_404(Submission, submission_id)
+    _require_group_member(submission.group_id)
+    return send_file(get_store().blob_path(submission.sha256), as_attachment=True,
+                     download_name=submission.filename, etag=submission.sha256, conditional=True)
+
+@bp.route('/groups/<int:group_id>/stream')
+@login_required
+def group_stream(group_id):
+    _require_group_member(group_id)
+    broker = current_app.extensions['message_broker']
+    heartbeat = current_app.config['MESSAGE_STREAM_HEARTBEAT']
+    subscription = broker.subscribe(group_id)
+    # Release the DB connection; the stream only reads from the broker
+    db.session.remove()
+
+    def events():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                payloads, dropped = subscription.get(timeout=heartbeat)
+                if subscription.closed:
+                    return
+                if dropped:
+                    yield f'event: resync\ndata: {dropped}\n\n'
+                if not payloads:
+                    yield ': keepalive\n\n'
+                for payload in payloads:
+                    yield f'event: message\ndata: {payload}\n\n'
+        finally:
+            broker.unsubscribe(subscription)
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @bp.route('/mood/history')
 @login_required
 def mood_history():
-    student = Student.query.filter_by(user_id=current_user.id).first()
+    student = _current_student()
     if student:
-        history = student.get_mood_history()
-        return render_template('mood_history.html', title='Mood History', history=history)
+        page_size = current_app.config['MOOD_HISTORY_PAGE_SIZE']
+        start = _parse_date(request.args.get('start'))
+        end = _parse_end_date(request.args.get('end'))
+        history = student.get_mood_history(
+            start=start,
+            end=end,
+            before=decode_cursor(request.args.get('before')),
+            limit=page_size
+        )
+        next_cursor = None
+        if len(history) == page_size:
+            next_cursor = encode_cursor(history[-1].date, history[-1].id)
+        return stream_template(
+            'mood_history.html',
+            title='Mood History',
+            history=history,
+            next_cursor=next_cursor,
+            start=request.args.get('start', ''),
+            end=request.args.get('end', '')
+        )
     flash('No mood history available', 'info')
     return redirect(url_for('main.dashboard'))
 
 @bp.route('/appointments')
 @login_required
 def appointments():
-    student = Student.query.filter_by(user_id=current_user.id).first()
+    student = _current_student()
     if student:
-        appointments = student.get_appointments()
-        return render_template('appointments.html', title='Appointments', appointments=appointments)
+        view = request.args.get('view', 'upcoming')
+        if view not in Appointment.VIEWS:
+            view = 'upcoming'
+        status = request.args.get('status') or None
+        page_size = current_app.config['APPOINTMENTS_PAGE_SIZE']
+        appointments = student.get_appointments(
+            view,
+            status=status,
+            after=decode_cursor(request.args.get('after')),
+            limit=page_size
+        )
+        next_cursor = None
+        if len(appointments) == page_size:
+            next_cursor = encode_cursor(appointments[-1].date, appointments[-1].id)
+        return render_template('appointments.html', title='Appointments', appointments=appointments,
+                               view=view, status=status, next_cursor=next_cursor)
     flash('No appointments found', 'info')
     return redirect(url_for('main.dashboard'))
 
+@bp.route('/export/<any(mood, appointments):kind>.<any(csv, ndjson):fmt>')
+@login_required
+def export_data(kind, fmt):
+    """Stream the student's own rows, or any student's (all students by default) for staff."""
+    from app.exports import FORMATS, stream_export
+    if current_user.is_staff:
+        student_id = request.args.get('student_id', type=int)
+    else:
+        student = _current_student()
+        if student is None:
+            abort(404)
+        student_id = student.id
+    chunks = stream_export(
+        kind, fmt,
+        student_id=student_id,
+        start=_parse_date(request.args.get('start')),
+        end=_parse_end_date(request.args.get('end')),
+        chunk_size=current_app.config['EXPORT_CHUNK_SIZE']
+    )
+    filename = f'{kind}-{student_id or "all"}.{fmt}'
+    return Response(stream_with_context(chunks), mimetype=FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@bp.route('/staff/analytics/cohort')
+@login_required
+def cohort_analytics():
+    if not current_user.is_staff:
+        abort(403)
+    # Imported lazily so NumPy is only loaded by the processes that serve analytics
+    from app.analytics import cached_cohort_report
+    days = min(max(request.args.get('days', 365, type=int), 1), 730)
+    report = cached_cohort_report(current_app.config['COHORT_ANALYTICS_TTL'], days=days)
+    return jsonify(report)
+
+@bp.route('/staff/cache-stats')
+@login_required
+def cache_stats():
+    if not current_user.is_staff:
+        abort(403)
+    return jsonify(get_cache().stats.to_dict())
+
 @bp.errorhandler(404)
 def error_404(error):
     return render_template('errors/404.html', title='404'), 404
@@ -0,0 +1,166 @@
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+from app import db
+from app.models import GroupTaskStatus, Task
+
+logger = logging.getLogger('app.scheduler')
+
+START = 'start'
+END = 'end'
+
+
+class TaskLifecycleScheduler:
+    """Moves GroupTaskStatus rows forward exactly when tasks start and end.
+
+    Upcoming task boundaries inside a lookahead window are read with index range scans on
+    start_datetime/end_datetime and kept in a heap. The worker sleeps until the earliest boundary,
+    applies every due boundary as batched UPDATEs, and only goes back to the database to load the
+    next window. The full catch_up() scan runs once, at startup. After that the window is reloaded
+    at least every `max_sleep` seconds, so tasks created or moved by other processes are picked up,
+    and right after a Task change commits in this process, when the changed tasks are also
+    re-checked by id in case a boundary has already passed.
+    """
+
+    def __init__(self, app, lookahead=timedelta(hours=24), max_sleep=300):
+        self.app = app
+        self.lookahead = lookahead
+        self.max_sleep = max_sleep
+        self.heap = []
+        self.cursor = None
+        self.horizon = None
+        self.stopping = threading.Event()
+        self.wakeup = threading.Event()
+        self.changed = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        app.extensions['task_scheduler'] = self
+        if not event.contains(db.session, 'after_flush', _note_task_changes):
+            event.listen(db.session, 'after_flush', _note_task_changes)
+            event.listen(db.session, 'after_commit', _wake_scheduler)
+            event.listen(db.session, 'after_rollback', _discard_task_changes)
+
+    def _load_window(self, now):
+        """Replace the heap with boundaries in (cursor, now + lookahead]."""
+        until = now + self.lookahead
+        self.heap = []
+        for kind, column in ((START, Task.start_datetime), (END, Task.end_datetime)):
+            rows = db.session.execute(
+                db.select(column, Task.id).where(column > self.cursor, column <= until)
+            )
+            self.heap.extend((when, kind, task_id) for when, task_id in rows)
+        heapq.heapify(self.heap)
+        self.horizon = until
+
+    def catch_up(self, now=None):
+        """Apply every transition that is already due, e.g. after downtime; returns rows changed.
+
+        This scans statuses for every past task, so it only runs when the scheduler starts.
+        """
+        now = now or datetime.now()
+        changed = GroupTaskStatus.activate_started(now) + GroupTaskStatus.close_ended(now)
+        db.session.commit()
+        self.cursor = now
+        self._load_window(now)
+        return changed
+
+    def recheck(self, task_ids, now=None):
+        """Apply due transitions for just these tasks and reload the window for their new boundaries."""
+        now = now or datetime.now()
+        task_ids = list(task_ids)
+        changed = GroupTaskStatus.activate_started(now, task_ids) + GroupTaskStatus.close_ended(now, task_ids)
+        db.session.commit()
+        self._load_window(now)
+        return changed
+
+    def run_once(self, now=None):
+        """Apply all boundaries due by `now` in one batch per kind; returns the boundaries applied."""
+        now = now or datetime.now()
+        if self.cursor is None:
+            self.catch_up(now)
+            return []
+        if now >= self.horizon:
+            # Reload from the previous run, so boundaries added behind the old window are still applied
+            self._load_window(now)
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap))
+        starting = [task_id for _, kind, task_id in due if kind == START]
+        ending = [task_id for _, kind, task_id in due if kind == END]
+        if starting:
+            GroupTaskStatus.transition(
+                'Active', db.and_(Task.id.in_(starting), Task.start_datetime <= now, Task.end_datetime > now),
+                ['Inactive']
+            )
+        if ending:
+            GroupTaskStatus.transition(
+                'Closed', db.and_(Task.id.in_(ending), Task.end_datetime <= now), ['Inactive', 'Active']
+            )
+        if due:
+            db.session.commit()
+            logger.info('Applied %d task starts and %d task ends', len(starting), len(ending))
+        self.cursor = now
+        return due
+
+    def seconds_until_next(self, now=None):
+        now = now or datetime.now()
+        next_event = min(self.heap[0][0], self.horizon) if self.heap else self.horizon
+        return max(0.0, min((next_event - now).total_seconds(), self.max_sleep))
+
+    def run(self):
+        """Process boundaries until stop() is called."""
+        while not self.stopping.is_set():
+            with self.app.app_context():
+                self.wakeup.clear()
+                with self.lock:
+                    changed, self.changed = self.changed, set()
+                if changed and self.cursor is not None:
+                    self.recheck(changed)
+                self.run_once()
+                timeout = self.seconds_until_next()
+                if timeout == self.max_sleep:
+                    # Nothing due soon: refresh the window so newly created tasks are seen
+                    self.horizon = datetime.now()
+                db.session.remove()
+            self.wakeup.wait(timeout)
+
+    def wake(self, task_ids=()):
+        """Re-check these tasks and reload the boundary window now, e.g. after they were created or rescheduled."""
+        with self.lock:
+            self.changed.update(task_ids)
+        self.wakeup.set()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='task-lifecycle-scheduler', daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self):
+        self.stopping.set()
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join()
+
+
+def _note_task_changes(session, flush_context):
+    task_ids = [obj.id for obj in (*session.new, *session.dirty) if isinstance(obj, Task)]
+    if task_ids:
+        session.info.setdefault('changed_task_ids', set()).update(task_ids)
+
+
+def _wake_scheduler(session):
+    task_ids = session.info.pop('changed_task_ids', None)
+    if not task_ids or not has_app_context():
+        return
+    scheduler = current_app.extensions.get('task_scheduler')
+    if scheduler is not None:
+        scheduler.wake(task_ids)
+
+
+def _discard_task_changes(session):
+    session.info.pop('changed_task_ids', None)
@@ -0,0 +1,53 @@
+import os
+
+from flask import current_app
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from app.cache import get_cache
+
+
+class FragmentCacheExtension(Extension):
+    """`{% cache 'name', key1, key2 %}...{% endcache %}` stores the rendered block in the app cache.
+
+    The key parts should include everything the block depends on: a user id for per-user
+    blocks, and a version stamp that changes whenever the underlying data does, so a stale
+    fragment is simply never looked up again and ages out of the cache.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_render_cached', [nodes.List(parts)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render_cached(self, parts, caller):
+        config = current_app.config
+        if not config['TEMPLATE_FRAGMENT_CACHE']:
+            return caller()
+        key = 'fragment:' + ':'.join(str(part) for part in parts)
+        cache = get_cache()
+        html = cache.get(key)
+        if html is None:
+            html = caller()
+            cache.set(key, str(html), config['TEMPLATE_FRAGMENT_TTL'])
+        return Markup(html)
+
+
+def init_app(app):
+    """Configure the Jinja environment; must run before anything touches app.jinja_env."""
+    options = dict(app.jinja_options)
+    options['extensions'] = [*options.get('extensions', ()), FragmentCacheExtension]
+    cache_dir = app.config['TEMPLATE_BYTECODE_CACHE_DIR']
+    if cache_dir:
+        # Compiled templates persist across restarts and are shared by workers on the host
+        os.makedirs(cache_dir, exist_ok=True)
+        options['bytecode_cache'] = FileSystemBytecodeCache(cache_dir)
+    app.jinja_options = options
@@ -0,0 +1,28 @@
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.database import is_statement_timeout
+
+
+def run_in_transaction(action, attempts=5, backoff=0.005):
+    """Run `action` and commit, retrying the whole unit of work on transient lock errors.
+
+    SQLite reports a lost write race as "database is locked" and Postgres reports
+    serialization failures as OperationalError; both are safe to retry from scratch.
+    Statement timeouts and any other exception roll back and propagate.
+    """
+    for attempt in range(attempts):
+        try:
+            result = action()
+            db.session.commit()
+            return result
+        except OperationalError as error:
+            db.session.rollback()
+            if attempt == attempts - 1 or is_statement_timeout(error):
+                raise
+            time.sleep(backoff * 2 ** attempt)
+        except Exception:
+            db.session.rollback()
+            raise
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # Windows: chunks are then only serialised within one process
+    fcntl = None
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload stream goes past the size it is allowed to reach."""
+
+
+class UploadBusy(RuntimeError):
+    """Raised when another request is already writing a chunk of the same upload."""
+
+
+class BlobStore:
+    """Content-addressed file store: blobs/<aa>/<bb>/<sha256>, plus partial/<upload id> for resumable uploads.
+
+    Uploads are streamed to disk in `chunk_size` reads while being hashed, so a worker never
+    holds more than one chunk of a file in memory. Identical files share one blob.
+    """
+
+    def __init__(self, root, chunk_size=64 * 1024, max_cached_hashers=256):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.max_cached_hashers = max_cached_hashers
+        self.hashers = OrderedDict()
+        self.lock = threading.Lock()
+        self.writing = set()
+        os.makedirs(os.path.join(root, 'blobs'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'partial'), exist_ok=True)
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, 'blobs', digest[:2], digest[2:4], digest)
+
+    def partial_path(self, upload_id):
+        return os.path.join(self.root, 'partial', upload_id)
+
+    def _copy(self, stream, out, hasher, limit):
+        written = 0
+        while True:
+            chunk = stream.read(self.chunk_size)
+            if not chunk:
+                return written
+            written += len(chunk)
+            if written > limit:
+                raise UploadTooLarge(f'upload exceeds {limit} bytes')
+            hasher.update(chunk)
+            out.write(chunk)
+
+    def _commit(self, path, digest):
+        """Move a finished file into place, or drop it if an identical blob is already stored."""
+        dest = self.blob_path(digest)
+        if os.path.exists(dest):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(path, dest)
+        return dest
+
+    def save_stream(self, stream, max_size):
+        """Store a whole upload from `stream`; returns (sha256 hex digest, size)."""
+        hasher = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.root, 'partial'), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                size = self._copy(stream, out, hasher, max_size)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        digest = hasher.hexdigest()
+        self._commit(tmp_path, digest)
+        return digest, size
+
+    def start(self, upload_id):
+        open(self.partial_path(upload_id), 'wb').close()
+
+    def _hasher(self, upload_id, offset):
+        """The running hash for an upload at `offset`, rebuilt from the partial file after a restart."""
+        cached = self.hashers.pop(upload_id, None)
+        if cached is not None and cached[0] == offset:
+            return cached[1]
+        hasher = hashlib.sha256()
+        with open(self.partial_path(upload_id), 'rb') as partial:
+            remaining = offset
+            while remaining:
+                chunk = partial.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                remaining -= len(chunk)
+        return hasher
+
+    @contextmanager
+    def locked(self, upload_id):
+        """Hold the upload's partial file exclusively (across processes where flock exists), or raise UploadBusy."""
+        with self.lock:
+            if upload_id in self.writing:
+                raise UploadBusy(upload_id)
+            self.writing.add(upload_id)
+        try:
+            with open(self.partial_path(upload_id), 'rb') as partial:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(partial, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        raise UploadBusy(upload_id) from None
+                yield
+        finally:
+            with self.lock:
+                self.writing.discard(upload_id)
+
+    def append(self, upload_id, stream, offset, max_size):
+        """Append one chunk at `offset` (bytes already accepted); returns the new offset."""
+        with self.lock:
+            hasher = self._hasher(upload_id, offset)
+        with open(self.partial_path(upload_id), 'r+b') as partial:
+            # Anything past the accepted offset is a chunk that failed halfway; overwrite it
+            partial.truncate(offset)
+            partial.seek(offset)
+            try:
+                written = self._copy(stream, partial, hasher, max_size - offset)
+            except BaseException:
+                partial.truncate(offset)
+                raise
+        with self.lock:
+            self.hashers[upload_id] = (offset + written, hasher)
+            while len(self.hashers) > self.max_cached_hashers:
+                self.hashers.popitem(last=False)
+        return offset + written
+
+    def finish(self, upload_id, size):
+        """Move a complete resumable upload into the blob store; returns its digest."""
+        with self.lock:
+            digest = self._hasher(upload_id, size).hexdigest()
+        self._commit(self.partial_path(upload_id), digest)
+        return digest
+
+    def discard(self, upload_id):
+        with self.lock:
+            self.hashers.pop(upload_id, None)
+        if os.path.exists(self.partial_path(upload_id)):
+            os.remove(self.partial_path(upload_id))
+
+
+def get_store():
+    return current_app.extensions['upload_store']
+
+
+def init_app(app):
+    app.extensions['upload_store'] = BlobStore(app.config['UPLOAD_FOLDER'], app.config['UPLOAD_CHUNK_SIZE'])
@@ -0,0 +1,138 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+
+from flask import current_app
+
+from app.models import MoodEntry
+from app.transactions import run_in_transaction
+
+logger = logging.getLogger('app.write_behind')
+
+DURABILITY = ('commit', 'queued')
+
+
+class MoodWriteQueue:
+    """Write-behind buffer that lands mood entries in group commits.
+
+    Requests queue a validated entry and a background writer inserts whatever has built up, at
+    most `batch_size` rows, once the batch is full or its oldest entry has waited `max_delay`
+    seconds: one transaction, and so one fsync, per batch instead of per request. With durability
+    'commit' log() blocks until the entry's batch has committed; with 'queued' it returns as soon
+    as the entry is buffered, and anything still queued if the process dies is lost. close()
+    writes out everything pending, and init_app runs it at interpreter exit.
+    """
+
+    def __init__(self, app, batch_size=200, max_delay=0.01, durability='commit', max_pending=10000, timeout=10):
+        if durability not in DURABILITY:
+            raise ValueError(f'Unknown mood write durability {durability!r}; expected one of {DURABILITY}')
+        self.app = app
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.durability = durability
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = deque()
+        self.ready = threading.Condition(threading.Lock())
+        self.closed = False
+        self.thread = None
+
+    def submit(self, student_id, score, notes=None, activities=None):
+        """Queue one entry, blocking while `max_pending` are queued; returns a Future set once it commits."""
+        MoodEntry.check_score(score)
+        row = {'student_id': student_id, 'score': score, 'notes': notes, 'activities': activities,
+               'date': datetime.utcnow()}
+        future = Future()
+        with self.ready:
+            while len(self.pending) >= self.max_pending and not self.closed:
+                self.ready.wait()
+            if self.closed:
+                raise RuntimeError('Mood write queue is closed')
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='mood-write-behind', daemon=True)
+                self.thread.start()
+            self.pending.append((time.monotonic(), row, future))
+            # The writer only needs waking to start a batch timer or when a batch fills up
+            if len(self.pending) == 1 or len(self.pending) >= self.batch_size:
+                self.ready.notify_all()
+        return future
+
+    def log(self, student_id, score, notes=None, activities=None):
+        """Queue one entry and, with 'commit' durability, wait for its batch to commit."""
+        future = self.submit(student_id, score, notes, activities)
+        if self.durability == 'commit':
+            future.result(self.timeout)
+        return future
+
+    def _take_batch(self):
+        """Wait for a full or overdue batch; returns None once closed and empty."""
+        with self.ready:
+            while True:
+                if not self.pending:
+                    if self.closed:
+                        return None
+                    self.ready.wait()
+                    continue
+                if self.closed or len(self.pending) >= self.batch_size:
+                    break
+                remaining = self.pending[0][0] + self.max_delay - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.ready.wait(remaining)
+            batch = [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+            # Release submitters held back by max_pending
+            self.ready.notify_all()
+            return batch
+
+    def _write(self, batch):
+        rows = [row for _, row, _ in batch]
+        try:
+            run_in_transaction(lambda: MoodEntry.insert_many(rows))
+        except Exception as error:
+            if len(batch) > 1:
+                # Retry one by one so a single bad row (e.g. a deleted student) only fails its own request
+                for item in batch:
+                    self._write([item])
+                return
+            logger.exception('Failed to write mood entry for student %s', rows[0]['student_id'])
+            batch[0][2].set_exception(error)
+            return
+        for _, _, future in batch:
+            future.set_result(None)
+
+    def run(self):
+        """Write batches until close() is called and the queue is empty."""
+        while (batch := self._take_batch()) is not None:
+            with self.app.app_context():
+                self._write(batch)
+
+    def close(self, timeout=None):
+        """Stop accepting entries and wait for everything queued to be written."""
+        with self.ready:
+            self.closed = True
+            self.ready.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+
+def get_mood_queue():
+    """The app's MoodWriteQueue, or None when MOOD_WRITE_BEHIND is off."""
+    return current_app.extensions.get('mood_write_queue')
+
+
+def init_app(app):
+    if not app.config['MOOD_WRITE_BEHIND']:
+        return
+    queue = MoodWriteQueue(
+        app,
+        batch_size=app.config['MOOD_WRITE_BATCH_SIZE'],
+        max_delay=app.config['MOOD_WRITE_MAX_DELAY_MS'] / 1000,
+        durability=app.config['MOOD_WRITE_DURABILITY'],
+        max_pending=app.config['MOOD_WRITE_MAX_PENDING']
+    )
+    app.extensions['mood_write_queue'] = queue
+    atexit.register(queue.close)
@@ -0,0 +1,108 @@
+"""Concurrent booking load test for atomic AppointmentSlot claiming.
+
+Fires many simultaneous bookings at a single slot and checks that exactly one wins, then
+measures booking throughput when every request targets its own slot.
+
+    python -m benchmarks.booking_contention --bookings 300
+    python -m benchmarks.booking_contention --database-uri postgresql://localhost/unisupport_bench
+
+Without --database-uri the test runs against a temporary SQLite file in WAL mode.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.models import Appointment, AppointmentSlot, SlotUnavailable, Student, SupportService
+from app.transactions import run_in_transaction
+from benchmarks.common import make_app, seed_students
+
+
+def _run(app, bookings, workers, targets):
+    parties = min(workers, bookings)
+    barrier = threading.Barrier(parties)
+    outcomes = {'won': 0, 'lost': 0, 'error': 0}
+    lock = threading.Lock()
+
+    def attempt(student_id):
+        with app.app_context():
+            if student_id <= parties:
+                barrier.wait()
+            try:
+                run_in_transaction(
+                    lambda: db.session.get(Student, student_id).book_appointment('counselling', targets(student_id)),
+                    attempts=20
+                )
+                outcome = 'won'
+            except SlotUnavailable:
+                outcome = 'lost'
+            except OperationalError:
+                outcome = 'error'
+        with lock:
+            outcomes[outcome] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(attempt, range(1, bookings + 1)))
+    elapsed = time.perf_counter() - start
+    return {**outcomes, 'seconds': round(elapsed, 4), 'bookings_per_second': round(bookings / elapsed, 1)}
+
+
+def run_backend(database_uri, bookings, workers):
+    options = {'pool_size': workers, 'max_overflow': 0, 'pool_timeout': 60}
+    if database_uri is None:
+        options['connect_args'] = {'timeout': 30}
+    app = make_app(database_uri, SQLALCHEMY_ENGINE_OPTIONS=options)
+    base = (datetime.now() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            db.session.execute(db.text('PRAGMA journal_mode=WAL'))
+        seed_students(bookings)
+        service = SupportService('Counselling Service', 'counselling')
+        db.session.add(service)
+        db.session.flush()
+        db.session.execute(db.insert(AppointmentSlot), [
+            {'service_id': service.id, 'date': base + timedelta(minutes=i)} for i in range(bookings + 1)
+        ])
+        db.session.commit()
+        backend = db.engine.dialect.name
+
+    results = {'backend': backend}
+    results['same_slot'] = _run(app, bookings, workers, lambda student_id: base)
+    with app.app_context():
+        winners = db.session.scalar(db.select(db.func.count()).select_from(Appointment))
+        results['same_slot']['appointments_created'] = winners
+        results['same_slot']['exactly_one_winner'] = winners == 1 and results['same_slot']['won'] == 1
+        db.session.execute(db.delete(Appointment))
+        db.session.execute(db.update(AppointmentSlot).values(is_available=True))
+        db.session.commit()
+
+    results['distinct_slots'] = _run(app, bookings, workers, lambda student_id: base + timedelta(minutes=student_id))
+    with app.app_context():
+        results['distinct_slots']['appointments_created'] = db.session.scalar(
+            db.select(db.func.count()).select_from(Appointment)
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bookings', type=int, default=300)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--database-uri', help='Postgres-compatible URI to test instead of SQLite WAL.')
+    args = parser.parse_args()
+
+    results = run_backend(args.database_uri, args.bookings, args.workers)
+    print(json.dumps(results, indent=2))
+    if not results['same_slot']['exactly_one_winner']:
+        raise SystemExit('Double booking detected: more than one request claimed the same slot')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Compare the vectorized cohort analytics job with a naive per-student ORM loop.
+
+    python -m benchmarks.cohort_analytics --students 2000 --days 365
+"""
+import argparse
+import json
+from collections import defaultdict
+from datetime import datetime
+
+from app import db
+from app.analytics import cohort_report, RECENT_DAYS, BASELINE_DAYS
+from app.models import Student
+from benchmarks.common import make_app, seed_mood_entries, seed_students, timed
+
+
+def naive_report(as_of, days, drop_threshold=1.5):
+    as_of = as_of.date()
+    distribution = defaultdict(int)
+    daily = defaultdict(lambda: [0, 0])
+    drops = []
+    for student in db.session.scalars(db.select(Student)):
+        recent, baseline = [], []
+        for entry in student.mood_history:
+            age = (as_of - entry.date.date()).days
+            if not 0 <= age < days:
+                continue
+            distribution[entry.score] += 1
+            daily[age][0] += entry.score
+            daily[age][1] += 1
+            if age < RECENT_DAYS:
+                recent.append(entry.score)
+            elif age < RECENT_DAYS + BASELINE_DAYS:
+                baseline.append(entry.score)
+        if recent and baseline:
+            drop = sum(baseline) / len(baseline) - sum(recent) / len(recent)
+            if drop >= drop_threshold:
+                drops.append((student.id, drop))
+        db.session.expunge(student)
+    return distribution, daily, drops
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--database-uri')
+    args = parser.parse_args()
+
+    app = make_app(args.database_uri)
+    results = {'students': args.students, 'days': args.days}
+    as_of = datetime.utcnow()
+    with app.app_context():
+        with timed(results, 'seed_seconds'):
+            seed_students(args.students)
+            seed_mood_entries(args.students, args.days, as_of=as_of)
+        with timed(results, 'vectorized_seconds'):
+            report = cohort_report(as_of=as_of, days=args.days)
+        db.session.expire_all()
+        with timed(results, 'naive_orm_seconds'):
+            _, _, naive_drops = naive_report(as_of, args.days)
+        results['entries'] = report['entries']
+        results['drops_match'] = len(report['drops']) == min(len(naive_drops), 100)
+        results['speedup'] = round(results['naive_orm_seconds'] / results['vectorized_seconds'], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Shared helpers for the benchmark scripts.
+
+Run benchmarks from the repository root as modules, e.g. ``python -m benchmarks.cohort_analytics``.
+"""
+import os
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from config import Config
+from app import create_app, db
+from app.models import User, Student, MoodEntry
+
+
+def make_app(database_uri=None, **overrides):
+    """Create an app bound to a fresh database (a temporary SQLite file by default) with tables created."""
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': database_uri or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'),
+        'WTF_CSRF_ENABLED': False,
+        'TESTING': True,
+        **overrides
+    }
+    app = create_app(type('BenchConfig', (Config,), settings))
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@contextmanager
+def timed(results, label):
+    start = time.perf_counter()
+    yield
+    results[label] = round(time.perf_counter() - start, 4)
+
+
+@contextmanager
+def count_queries(engine):
+    """Collect the SQL statements executed on `engine` inside the block into the yielded list."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def login_client(app, username, password):
+    client = app.test_client()
+    response = client.post('/login', data={'username': username, 'password': password})
+    assert response.status_code == 302, f'login failed for {username}'
+    return client
+
+
+def _insert_batches(model, rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(db.insert(model), batch)
+            batch = []
+    if batch:
+        db.session.execute(db.insert(model), batch)
+
+
+def seed_students(count, batch_size=5000, password_hash=None):
+    """Bulk insert `count` users with matching student profiles; ids run from 1 to `count`."""
+    _insert_batches(User, (
+        {'id': i, 'username': f'bench{i}', 'email': f'bench{i}@example.com', 'role': 'student',
+         'password_hash': password_hash, 'registered': True}
+        for i in range(1, count + 1)
+    ), batch_size)
+    _insert_batches(Student, (
+        {'id': i, 'user_id': i, 'name': f'Bench Student {i}'} for i in range(1, count + 1)
+    ), batch_size)
+    db.session.commit()
+
+
+def seed_mood_entries(student_count, days, as_of=None, batch_size=20000, seed=0):
+    """Bulk insert one mood entry per student per day for the `days` days up to `as_of`."""
+    rng = random.Random(seed)
+    as_of = as_of or datetime.utcnow()
+    start = as_of - timedelta(days=days - 1)
+    _insert_batches(MoodEntry, (
+        {'student_id': student_id, 'date': start + timedelta(days=day, minutes=student_id % 600),
+         'score': rng.randint(1, 5)}
+        for student_id in range(1, student_count + 1)
+        for day in range(days)
+    ), batch_size)
+    db.session.commit()
@@ -0,0 +1,65 @@
+"""Concurrent registration stress test: throughput and correctness under duplicate signups.
+
+Worker threads each register through the Flask test client, drawing usernames from a pool
+smaller than the number of attempts so many signups race for the same name. Every attempt
+must end in either a redirect (created) or a form error, never a 500, and each username may
+exist at most once.
+
+    python -m benchmarks.concurrent_registration --attempts 400 --threads 8 --names 100
+"""
+import argparse
+import json
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from app import db
+from app.models import User
+from benchmarks.common import make_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--attempts', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--names', type=int, default=100)
+    parser.add_argument('--method', default='pbkdf2:sha256:1000', help='Hash method; cheap by default to stress the database.')
+    args = parser.parse_args()
+
+    app = make_app(PASSWORD_HASH_METHOD=args.method)
+    rng = random.Random(0)
+    names = [rng.randrange(args.names) for _ in range(args.attempts)]
+
+    def register(n):
+        client = app.test_client()
+        response = client.post('/register', data={
+            'username': f'user{n}', 'email': f'user{n}@student.example.ac.uk',
+            'password': 'password', 'password2': 'password'
+        })
+        if response.status_code == 302:
+            return 'created'
+        if response.status_code == 200 and b'Please use a different' in response.data:
+            return 'rejected'
+        return f'http_{response.status_code}'
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as threads:
+        outcomes = Counter(threads.map(register, names))
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        users = db.session.scalar(db.select(db.func.count(User.id)))
+    print(json.dumps({
+        'attempts': args.attempts,
+        'threads': args.threads,
+        'distinct_names': len(set(names)),
+        'outcomes': dict(outcomes),
+        'users_created': users,
+        'correct': users == len(set(names)) == outcomes['created'] and set(outcomes) <= {'created', 'rejected'},
+        'registrations_per_second': round(args.attempts / elapsed, 1),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
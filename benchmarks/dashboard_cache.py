@@ -0,0 +1,61 @@
+"""Dashboard latency and cache hit ratio with and without the view-model cache.
+
+Each student loads the dashboard repeatedly and occasionally logs a mood, which invalidates
+their cached dashboard.
+
+    python -m benchmarks.dashboard_cache --students 20 --requests 500
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.cache import get_cache
+from benchmarks.common import count_queries, login_client, make_app, seed_mood_entries, seed_students
+
+
+def run(max_entries, args):
+    app = make_app(CACHE_MAX_ENTRIES=max_entries)
+    with app.app_context():
+        seed_students(args.students, password_hash=generate_password_hash('password'))
+        seed_mood_entries(args.students, 90)
+        engine = db.engine
+    clients = [login_client(app, f'bench{i}', 'password') for i in range(1, args.students + 1)]
+
+    rng = random.Random(0)
+    latencies = []
+    with count_queries(engine) as statements:
+        for _ in range(args.requests):
+            client = rng.choice(clients)
+            if rng.random() < args.write_ratio:
+                client.post('/mood/log', data={'score': str(rng.randint(1, 5)), 'activities': 'rest'})
+                continue
+            started = time.perf_counter()
+            client.get('/dashboard')
+            latencies.append((time.perf_counter() - started) * 1000)
+    with app.app_context():
+        stats = get_cache().stats.to_dict()
+    latencies.sort()
+    return {
+        'dashboard_ms_p50': round(statistics.median(latencies), 3),
+        'dashboard_ms_p95': round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        'queries': len(statements),
+        'cache': stats
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--write-ratio', type=float, default=0.05)
+    args = parser.parse_args()
+    print(json.dumps({'cached': run(10000, args), 'uncached': run(0, args)}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
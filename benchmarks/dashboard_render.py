@@ -0,0 +1,80 @@
+"""Dashboard render time with and without the production template settings.
+
+Compares three configurations on the same data: the Jinja defaults with auto-reload on, the
+persistent bytecode cache with auto-reload off, and the bytecode cache plus fragment caching.
+`cold_ms` is the first dashboard render in a freshly created app (template compile or
+bytecode load); `warm_*` are repeated renders once the app is warm.
+
+    python -m benchmarks.dashboard_render --requests 500
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from app import db
+from benchmarks.common import login_client, make_app
+from benchmarks.datagen import generate
+
+CONFIGS = {
+    'defaults': {'TEMPLATE_BYTECODE_CACHE_DIR': None, 'TEMPLATES_AUTO_RELOAD': True, 'TEMPLATE_FRAGMENT_CACHE': False},
+    'bytecode_cache': {'TEMPLATES_AUTO_RELOAD': False, 'TEMPLATE_FRAGMENT_CACHE': False},
+    'bytecode_and_fragments': {'TEMPLATES_AUTO_RELOAD': False, 'TEMPLATE_FRAGMENT_CACHE': True},
+}
+
+
+def measure(database_uri, settings, requests):
+    app = make_app(database_uri, PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', **settings)
+    client = login_client(app, 'bench1', 'password')
+    started = time.perf_counter()
+    client.get('/dashboard')
+    cold = (time.perf_counter() - started) * 1000
+
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get('/dashboard')
+        latencies.append((time.perf_counter() - started) * 1000)
+    assert response.status_code == 200
+    latencies.sort()
+    return {
+        'cold_ms': round(cold, 2),
+        'warm_p50_ms': round(statistics.median(latencies), 3),
+        'warm_p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        'warm_mean_ms': round(statistics.fmean(latencies), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='render-bench-')
+    database_uri = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    cache_dir = os.path.join(workdir, 'jinja_cache')
+    app = make_app(database_uri, PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    with app.app_context():
+        generate(students=50, moods=60, groups=5, messages=10)
+        db.session.execute(db.text(
+            "INSERT INTO appointments (student_id, service_type, date, status) "
+            "VALUES (1, 'counselling', datetime('now', '+2 days'), 'scheduled')"
+        ))
+        db.session.commit()
+
+    results = {}
+    for name, settings in CONFIGS.items():
+        settings = {'TEMPLATE_BYTECODE_CACHE_DIR': cache_dir, **settings}
+        if settings['TEMPLATE_BYTECODE_CACHE_DIR']:
+            # Prime the on-disk cache the way an earlier worker or deploy would have
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            measure(database_uri, settings, 1)
+        results[name] = measure(database_uri, settings, args.requests)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Parametrized synthetic dataset for load tests: students, mood entries, services, slots, groups, messages.
+
+Everything is written with batched Core inserts, then mood rollups are rebuilt and slots are
+generated through the same code paths the app uses. Seeded from `--seed`, so two runs with the
+same parameters produce the same data.
+
+    python -m benchmarks.datagen --database-uri sqlite:///bench.db --students 5000 --moods 90
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.debug_utils import rebuild_mood_rollups
+from app.models import Group, Message, MoodEntry, Student, SupportService, User
+from app.passwords import get_hasher
+from benchmarks.common import _insert_batches, make_app
+
+SERVICE_TYPES = ('counselling', 'wellbeing', 'career', 'academic', 'disability', 'financial', 'mentoring', 'health')
+ACTIVITIES = ('study', 'social', 'exercise', 'rest', 'other')
+
+
+def generate(students=1000, moods=30, services=4, slot_days=14, groups=50, messages=100,
+             password='password', seed=0, batch_size=10000):
+    """Populate the current app's database; returns row counts and per-phase timings.
+
+    Students are users `bench1`..`bench<students>` (ids 1..students) sharing one password hash,
+    spread round-robin over `groups` groups. Each student gets `moods` daily entries ending today
+    and each group `messages` messages from its members.
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    timings = {}
+
+    started = time.perf_counter()
+    pwhash = get_hasher().hash(password)
+    _insert_batches(Group, ({'id': i} for i in range(1, groups + 1)), batch_size)
+    _insert_batches(User, (
+        {'id': i, 'username': f'bench{i}', 'email': f'bench{i}@example.com', 'role': 'student',
+         'password_hash': pwhash, 'registered': True, 'group_id': (i % groups) + 1 if groups else None}
+        for i in range(1, students + 1)
+    ), batch_size)
+    _insert_batches(Student, (
+        {'id': i, 'user_id': i, 'name': f'Bench Student {i}'} for i in range(1, students + 1)
+    ), batch_size)
+    timings['users'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    start = now - timedelta(days=moods - 1)
+    _insert_batches(MoodEntry, (
+        # Up to 12 hours before the same time of day, so no entry lands in the future
+        {'student_id': student_id, 'date': start + timedelta(days=day, minutes=-rng.randrange(720)),
+         'score': rng.randint(1, 5), 'activities': rng.choice(ACTIVITIES)}
+        for student_id in range(1, students + 1)
+        for day in range(moods)
+    ), batch_size)
+    db.session.commit()
+    rollups = rebuild_mood_rollups(batch_size)
+    timings['moods'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(services):
+        service_type = SERVICE_TYPES[i % len(SERVICE_TYPES)]
+        db.session.add(SupportService(f'{service_type.title()} Service {i + 1}', service_type,
+                                      description=f'Synthetic {service_type} service', duration=30))
+    db.session.flush()
+    slots = SupportService.extend_slots(now + timedelta(days=slot_days))
+    db.session.commit()
+    timings['slots'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    members = {}
+    for user_id in range(1, students + 1 if groups else 1):
+        members.setdefault((user_id % groups) + 1, []).append(user_id)
+    _insert_batches(Message, (
+        {'group_id': group_id, 'user_id': rng.choice(users), 'content': f'Synthetic message {n}',
+         'sent_time': now - timedelta(minutes=messages - n)}
+        for group_id, users in members.items()
+        for n in range(messages)
+    ), batch_size)
+    db.session.commit()
+    timings['messages'] = time.perf_counter() - started
+
+    return {
+        'students': students,
+        'mood_entries': students * moods,
+        'mood_rollups': rollups,
+        'services': services,
+        'slots': slots,
+        'groups': groups,
+        'messages': len(members) * messages,
+        'seconds': {phase: round(elapsed, 2) for phase, elapsed in timings.items()},
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--moods', type=int, default=30, help='Mood entries per student (one per day).')
+    parser.add_argument('--services', type=int, default=4)
+    parser.add_argument('--slot-days', type=int, default=14)
+    parser.add_argument('--groups', type=int, default=50)
+    parser.add_argument('--messages', type=int, default=100, help='Messages per group.')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def dataset_options(args):
+    return {'students': args.students, 'moods': args.moods, 'services': args.services,
+            'slot_days': args.slot_days, 'groups': args.groups, 'messages': args.messages, 'seed': args.seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-uri', help='Target database (a temporary SQLite file by default).')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    app = make_app(args.database_uri)
+    with app.app_context():
+        summary = generate(**dataset_options(args))
+        summary['database_uri'] = db.engine.url.render_as_string(hide_password=True)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Queries and time to serialize groups with lazy loading versus the eager loader options.
+
+    python -m benchmarks.group_serialization --sizes 10 50 200
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Group, GroupTaskStatus, Task, User
+from benchmarks.common import count_queries, make_app
+
+
+def seed_group(users, tasks):
+    # Core inserts throughout, so statuses are only created for this group's own tasks
+    group_id = db.session.scalar(db.insert(Group).values().returning(Group.id))
+    db.session.execute(db.insert(User), [
+        {'username': f'g{group_id}u{i}', 'email': f'g{group_id}u{i}@example.com', 'role': 'student',
+         'group_id': group_id}
+        for i in range(users)
+    ])
+    now = datetime.now()
+    task_ids = db.session.scalars(db.insert(Task).returning(Task.id), [
+        {'title': f'Task {i}', 'description': 'Benchmark task', 'start_datetime': now,
+         'end_datetime': now + timedelta(hours=1), 'location': 'Library'}
+        for i in range(tasks)
+    ]).all()
+    db.session.execute(db.insert(GroupTaskStatus), [
+        {'group_id': group_id, 'task_id': task_id, 'status': 'Inactive'} for task_id in task_ids
+    ])
+    db.session.commit()
+    return group_id
+
+
+def measure(engine, serialize):
+    db.session.expunge_all()
+    with count_queries(engine) as statements:
+        started = time.perf_counter()
+        serialize()
+        elapsed = time.perf_counter() - started
+    return {'queries': len(statements), 'ms': round(elapsed * 1000, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200], help='Tasks per group.')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=2)
+    args = parser.parse_args()
+
+    app = make_app()
+    results = []
+    with app.app_context():
+        engine = db.engine
+        for tasks in args.sizes:
+            group_id = seed_group(args.users, tasks)
+            lazy = measure(engine, lambda: db.session.get(Group, group_id).to_dict(args.depth))
+            eager = measure(engine, lambda: Group.load_serializable([group_id], args.depth)[0].to_dict(args.depth))
+            results.append({'tasks': tasks, 'users': args.users, 'lazy': lazy, 'eager': eager})
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""Scripted load-test scenarios against the Flask test client or a local WSGI server.
+
+Seeds a synthetic dataset (see benchmarks.datagen), then runs each scenario in turn with
+`--concurrency` virtual users, each logged in as its own student. Per scenario it reports
+p50/p95/p99 latency, throughput, error count and SQL statements per request, and writes the
+results as JSON (tagged with the current commit) so runs can be compared across commits.
+
+    python -m benchmarks.loadtest --target client --students 2000 --requests 500
+    python -m benchmarks.loadtest --target wsgi --concurrency 8 --output results/wsgi.json
+"""
+import argparse
+import http.cookiejar
+import itertools
+import json
+import logging
+import os
+import platform
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from werkzeug.serving import make_server
+
+from app import db
+from app.models import AppointmentSlot, SupportService
+from benchmarks.common import count_queries, make_app
+from benchmarks.datagen import add_arguments, dataset_options, generate
+
+
+class ClientSession:
+    """One virtual user on the in-process Flask test client."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        return self.client.open(path, method=method, data=data).status_code
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class WSGISession:
+    """One virtual user talking HTTP to the local server, with its own cookie jar."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        try:
+            with self.opener.open(urllib.request.Request(self.base_url + path, data=body, method=method)) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+
+class LocalServer:
+    """Threaded Werkzeug server on an ephemeral port, run in a background thread."""
+
+    def __init__(self, app):
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server.server_port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.thread.join()
+
+
+def _login(session, student_id, password):
+    return session.request('POST', '/login', {'username': f'bench{student_id}', 'password': password})
+
+
+def _free_slots(app):
+    """Every open slot as booking form data, handed out once each so bookings never collide."""
+    with app.app_context():
+        rows = db.session.execute(
+            db.select(SupportService.service_type, AppointmentSlot.date)
+            .join(SupportService, AppointmentSlot.service_id == SupportService.id)
+            .where(AppointmentSlot.is_available, AppointmentSlot.date > datetime.now())
+            .order_by(AppointmentSlot.date)
+        ).all()
+    slots = iter([{'service_type': row.service_type, 'date': row.date.strftime('%Y-%m-%d %H:%M')} for row in rows])
+    lock = threading.Lock()
+
+    def take():
+        with lock:
+            return next(slots, None)
+    return take
+
+
+def build_scenarios(app, password):
+    take_slot = _free_slots(app)
+
+    def booking(user):
+        data = take_slot()
+        return user['session'].request('POST', '/appointments/book', data) if data else None
+
+    # Each scenario maps a virtual user to one request and returns its status (None to skip)
+    return {
+        'login': lambda user: _login(user['new_session'](), user['student_id'], password),
+        'dashboard': lambda user: user['session'].request('GET', '/dashboard'),
+        'mood_log': lambda user: user['session'].request('POST', '/mood/log', {'score': '4', 'activities': 'study'}),
+        'booking': booking,
+        'history': lambda user: user['session'].request('GET', '/mood/history'),
+    }
+
+
+# Status a successful request returns; form posts redirect, and re-render the form with 200 on failure
+EXPECTED_STATUS = {'login': 302, 'dashboard': 200, 'mood_log': 302, 'booking': 302, 'history': 200}
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def run_scenario(scenario, expected, users, requests, engine):
+    """Issue `requests` calls spread over the virtual users; returns latency and query stats."""
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    counter = itertools.count()
+
+    def worker(user):
+        nonlocal errors
+        while next(counter) < requests:
+            started = time.perf_counter()
+            status = scenario(user)
+            elapsed = (time.perf_counter() - started) * 1000
+            if status is None:
+                continue
+            with lock:
+                latencies.append(elapsed)
+                errors += status != expected
+
+    with count_queries(engine) as statements:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(users)) as pool:
+            list(pool.map(worker, users))
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'p50_ms': round(percentile(ordered, 0.50), 2) if ordered else None,
+        'p95_ms': round(percentile(ordered, 0.95), 2) if ordered else None,
+        'p99_ms': round(percentile(ordered, 0.99), 2) if ordered else None,
+        'mean_ms': round(sum(ordered) / len(ordered), 2) if ordered else None,
+        'throughput_rps': round(len(ordered) / elapsed, 1),
+        'queries_per_request': round(len(statements) / len(ordered), 2) if ordered else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', choices=('client', 'wsgi'), default='client')
+    parser.add_argument('--database-uri', help='Database to seed and test (a temporary SQLite file by default).')
+    parser.add_argument('--requests', type=int, default=300, help='Requests per scenario.')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--scenarios', default='login,dashboard,mood_log,booking,history')
+    parser.add_argument('--hash-method', default=None, help='Override PASSWORD_HASH_METHOD for the run.')
+    parser.add_argument('--output', help='Write the JSON results to this file as well as stdout.')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    overrides = {'PASSWORD_HASH_METHOD': args.hash_method} if args.hash_method else {}
+    app = make_app(args.database_uri, **overrides)
+    with app.app_context():
+        dataset = generate(**dataset_options(args))
+        engine = db.engine
+
+    password = 'password'
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'target': args.target,
+        'concurrency': args.concurrency,
+        'dataset': dataset,
+        'scenarios': {},
+    }
+
+    def run_all(new_session):
+        users = []
+        for i in range(args.concurrency):
+            student_id = i % args.students + 1
+            session = new_session()
+            _login(session, student_id, password)
+            users.append({'student_id': student_id, 'session': session, 'new_session': new_session})
+        scenarios = build_scenarios(app, password)
+        for name in args.scenarios.split(','):
+            results['scenarios'][name] = run_scenario(scenarios[name], EXPECTED_STATUS[name], users, args.requests, engine)
+
+    if args.target == 'client':
+        run_all(lambda: ClientSession(app))
+    else:
+        with LocalServer(app) as server:
+            run_all(lambda: WSGISession(server.base_url))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Memory per idle subscriber and publish-to-delivery latency for the in-process message broker.
+
+Each subscriber is a thread blocked on its buffer, the way an SSE response generator waits
+between events.
+
+    python -m benchmarks.message_fanout --subscribers 3000 --messages 20
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import tracemalloc
+
+from app.messaging import InProcessBroker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subscribers', type=int, default=3000)
+    parser.add_argument('--groups', type=int, default=1)
+    parser.add_argument('--messages', type=int, default=20)
+    parser.add_argument('--buffer', type=int, default=100)
+    args = parser.parse_args()
+
+    broker = InProcessBroker(buffer_size=args.buffer)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    subscriptions = [broker.subscribe(i % args.groups) for i in range(args.subscribers)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    subscription_bytes = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+    latencies = []
+    lock = threading.Lock()
+    received = threading.Semaphore(0)
+
+    def consume(subscription):
+        while True:
+            payloads, _ = subscription.get()
+            now = time.perf_counter()
+            if subscription.closed:
+                return
+            with lock:
+                latencies.extend(now - sent for sent in payloads)
+            for _ in payloads:
+                received.release()
+
+    threading.stack_size(256 * 1024)
+    threads = [threading.Thread(target=consume, args=(subscription,), daemon=True) for subscription in subscriptions]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+
+    publish_times = []
+    for _ in range(args.messages):
+        for group_id in range(args.groups):
+            started = time.perf_counter()
+            broker.publish(group_id, started)
+            publish_times.append(time.perf_counter() - started)
+            for _ in range(broker.subscriber_count(group_id)):
+                received.acquire()
+
+    for subscription in subscriptions:
+        broker.unsubscribe(subscription)
+    latencies.sort()
+    print(json.dumps({
+        'subscribers': args.subscribers,
+        'deliveries': len(latencies),
+        'bytes_per_subscription': round(subscription_bytes / args.subscribers),
+        'thread_stack_bytes': 256 * 1024,
+        'publish_call_ms_p50': round(statistics.median(publish_times) * 1000, 3),
+        'delivery_ms_p50': round(statistics.median(latencies) * 1000, 3),
+        'delivery_ms_p99': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        'delivery_ms_max': round(latencies[-1] * 1000, 3),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
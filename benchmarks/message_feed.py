@@ -0,0 +1,78 @@
+"""Group message feed latency as a group grows, for the first page and for deep cursors.
+
+    python -m benchmarks.message_feed --sizes 100 10000 100000 1000000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Group, Message, User
+from benchmarks.common import count_queries, make_app
+
+
+def grow_group(group_id, user_ids, start, count, batch_size=20000):
+    base = datetime(2024, 1, 1)
+    for offset in range(start, start + count, batch_size):
+        db.session.execute(db.insert(Message), [
+            {'group_id': group_id, 'user_id': user_ids[i % len(user_ids)], 'content': f'message {i}',
+             'sent_time': base + timedelta(seconds=i)}
+            for i in range(offset, min(offset + batch_size, start + count))
+        ])
+    db.session.commit()
+
+
+def timings(calls):
+    samples = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {'p50_ms': round(statistics.median(samples), 3), 'p95_ms': round(samples[int(len(samples) * 0.95) - 1], 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    app = make_app()
+    rng = random.Random(0)
+    results = []
+    with app.app_context():
+        group = Group()
+        db.session.add(group)
+        db.session.flush()
+        users = [User(username=f'member{i}', email=f'member{i}@example.com', role='student', group=group)
+                 for i in range(10)]
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+        group_id = group.id
+
+        existing = 0
+        for size in sorted(args.sizes):
+            grow_group(group_id, user_ids, existing, size - existing)
+            existing = size
+            base = datetime(2024, 1, 1)
+            cursors = [(base + timedelta(seconds=rng.randrange(size)), size + 1) for _ in range(args.queries)]
+            with count_queries(db.engine) as statements:
+                [message.to_dict() for message in Message.feed(group_id, limit=args.limit)]
+            results.append({
+                'messages': size,
+                'queries_per_page': len(statements),
+                'first_page': timings([lambda: Message.feed(group_id, limit=args.limit)] * args.queries),
+                'deep_cursor': timings([lambda c=c: Message.feed(group_id, before=c, limit=args.limit) for c in cursors]),
+            })
+            db.session.expunge_all()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
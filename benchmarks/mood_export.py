@@ -0,0 +1,67 @@
+"""Streaming export throughput and memory for mood entries.
+
+Seeds `--rows` mood entries (10M by default; lower it for a quick run), then streams the
+full table as CSV and NDJSON through app.exports and once through the HTTP endpoint. Peak
+RSS growth during each export should stay flat as the row count grows.
+
+    python -m benchmarks.mood_export --rows 10000000 --students 10000
+"""
+import argparse
+import json
+import resource
+import time
+
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.exports import stream_export
+from benchmarks.common import login_client, make_app, seed_mood_entries, seed_students
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(chunks):
+    before = peak_rss_mb()
+    started = time.perf_counter()
+    size = sum(len(chunk) for chunk in chunks)
+    elapsed = time.perf_counter() - started
+    return elapsed, size, round(peak_rss_mb() - before, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--students', type=int, default=10_000)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    app = make_app(EXPORT_CHUNK_SIZE=args.chunk_size)
+    results = {'rows': args.rows, 'chunk_size': args.chunk_size}
+    with app.app_context():
+        started = time.perf_counter()
+        seed_students(args.students, password_hash=generate_password_hash('password'))
+        seed_mood_entries(args.students, max(args.rows // args.students, 1))
+        results['seed_seconds'] = round(time.perf_counter() - started, 1)
+        rows = db.session.scalar(db.text('SELECT count(*) FROM mood_entries'))
+        db.session.remove()
+
+        for fmt in ('csv', 'ndjson'):
+            elapsed, size, rss_growth = measure(stream_export('mood', fmt, chunk_size=args.chunk_size))
+            results[fmt] = {'seconds': round(elapsed, 2), 'rows_per_second': round(rows / elapsed),
+                            'megabytes': round(size / 2 ** 20, 1), 'peak_rss_growth_mb': rss_growth}
+
+    client = login_client(app, 'bench1', 'password')
+    with app.app_context():
+        db.session.execute(db.text("UPDATE users SET role = 'staff' WHERE id = 1"))
+        db.session.commit()
+    response = client.get('/export/mood.ndjson')
+    elapsed, size, rss_growth = measure(response.response)
+    results['http_ndjson'] = {'seconds': round(elapsed, 2), 'rows_per_second': round(rows / elapsed),
+                              'peak_rss_growth_mb': rss_growth}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Mood logging write throughput: a commit per request versus write-behind group commits.
+
+`--clients` logged-in students POST /mood/log concurrently through the test client until
+`--requests` entries have been acknowledged. Runs 'per_request' (MOOD_WRITE_BEHIND off), then
+write-behind with 'commit' durability (acknowledged after the group commit) and 'queued'
+durability (acknowledged once buffered; the queue is drained before the clock stops). Each run
+reports throughput, latency, database commits, and checks every entry reached the table and the
+day rollups. The default 'dev' profile keeps synchronous=FULL, so each commit pays for an fsync.
+
+    python -m benchmarks.mood_write_batching --clients 16 --requests 4000 --profile sqlite
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+
+from app import db
+from app.models import MoodEntry, MoodRollup, User
+from app.write_behind import get_mood_queue
+from benchmarks.common import login_client, make_app, seed_students
+
+MODES = {
+    'per_request': {'MOOD_WRITE_BEHIND': False},
+    'group_commit': {'MOOD_WRITE_BEHIND': True, 'MOOD_WRITE_DURABILITY': 'commit'},
+    'queued': {'MOOD_WRITE_BEHIND': True, 'MOOD_WRITE_DURABILITY': 'queued'},
+}
+
+
+def run(mode, args):
+    app = make_app(
+        DATABASE_PROFILE=args.profile, PASSWORD_HASH_METHOD='pbkdf2:sha256:1',
+        MOOD_WRITE_BATCH_SIZE=args.batch_size, MOOD_WRITE_MAX_DELAY_MS=args.max_delay_ms, **MODES[mode]
+    )
+    with app.app_context():
+        seed_students(args.clients)
+        for user in db.session.scalars(db.select(User)):
+            user.set_password('password')
+        db.session.commit()
+        engine = db.engine
+        queue = get_mood_queue()
+    clients = [login_client(app, f'bench{i}', 'password') for i in range(1, args.clients + 1)]
+    # Warm up: the first POST per client loads its student profile
+    for client in clients:
+        client.post('/mood/log', data={'score': '3', 'activities': 'rest'})
+
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    counter = itertools.count()
+    commits = itertools.count()
+    event.listen(engine, 'commit', lambda conn: next(commits))
+
+    def worker(client):
+        nonlocal errors
+        while next(counter) < args.requests:
+            started = time.perf_counter()
+            status = client.post('/mood/log', data={'score': '4', 'activities': 'study'}).status_code
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors += status != 302
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        list(pool.map(worker, clients))
+    acknowledged = time.perf_counter() - started
+    if queue is not None:
+        queue.close()
+    elapsed = time.perf_counter() - started
+    commit_count = next(commits)
+
+    expected = args.requests + args.clients
+    with app.app_context():
+        entries = db.session.scalar(db.select(db.func.count()).select_from(MoodEntry))
+        rolled_up = db.session.scalar(db.select(db.func.sum(MoodRollup.count)).where(MoodRollup.period == 'day'))
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds_to_acknowledge': round(acknowledged, 3),
+        'seconds_to_durable': round(elapsed, 3),
+        'writes_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2], 2),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)], 2),
+        'commits': commit_count,
+        'entries_written': entries == expected and rolled_up == expected,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--profile', choices=('dev', 'sqlite'), default='dev')
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--max-delay-ms', type=int, default=10)
+    parser.add_argument('--modes', default=','.join(MODES))
+    args = parser.parse_args()
+    results = {mode: run(mode, args) for mode in args.modes.split(',')}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Login-style password verification throughput, inline versus the process-pool hasher.
+
+Simulates a login storm: `--concurrency` request threads each verify passwords, either hashing
+inline on the request thread or through PasswordHasher's process pool.
+
+    python -m benchmarks.password_hashing --logins 64 --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.passwords import PasswordHasher
+from config import Config
+
+
+def throughput(hasher, pwhash, logins, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as threads:
+        assert all(threads.map(lambda _: hasher.verify(pwhash, 'correct horse'), range(logins)))
+    return logins / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--method', default=Config.PASSWORD_HASH_METHOD)
+    args = parser.parse_args()
+
+    inline = PasswordHasher(args.method, workers=0, batch_workers=args.workers)
+    pooled = PasswordHasher(args.method, workers=args.workers)
+    pwhash = inline.hash('correct horse')
+    pooled.verify(pwhash, 'warm up')
+
+    inline_rate = throughput(inline, pwhash, args.logins, args.concurrency)
+    pooled_rate = throughput(pooled, pwhash, args.logins, args.concurrency)
+
+    started = time.perf_counter()
+    [inline.hash(f'seed{i}') for i in range(args.workers * 2)]
+    serial_seed = time.perf_counter() - started
+    started = time.perf_counter()
+    # The first batch starts the batch pool; later batches (e.g. the next roster chunk) reuse it
+    inline.hash_many(f'seed{i}' for i in range(args.workers * 2))
+    batch_seed = time.perf_counter() - started
+    started = time.perf_counter()
+    inline.hash_many(f'seed{i}' for i in range(args.workers * 2))
+    parallel_seed = time.perf_counter() - started
+    inline.shutdown()
+    pooled.shutdown()
+
+    print(json.dumps({
+        'method': args.method,
+        'workers': args.workers,
+        'inline_logins_per_second': round(inline_rate, 2),
+        'pooled_logins_per_second': round(pooled_rate, 2),
+        'pooled_logins_per_second_per_core': round(pooled_rate / args.workers, 2),
+        'seed_hashes': args.workers * 2,
+        'serial_seed_seconds': round(serial_seed, 3),
+        'batch_seed_seconds': round(batch_seed, 3),
+        'parallel_seed_seconds': round(parallel_seed, 3),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Queries issued per request for the logged-in pages, checked against per-endpoint budgets.
+
+    python -m benchmarks.request_queries
+"""
+import argparse
+import json
+
+from app import db
+from app.models import User
+from benchmarks.common import count_queries, login_client, make_app, seed_mood_entries, seed_students
+
+# Upper bounds on statements per request. Loading the user and student profile is one query,
+# so a budget increase here means a page has started issuing extra lookups.
+BUDGETS = {
+    ('GET', '/dashboard'): 6,
+    ('GET', '/mood/history'): 2,
+    ('GET', '/appointments'): 2,
+    ('POST', '/mood/log'): 5,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=60)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seed_students(1)
+        user = db.session.get(User, 1)
+        user.set_password('password')
+        db.session.commit()
+        seed_mood_entries(1, args.days)
+        engine = db.engine
+
+    client = login_client(app, 'bench1', 'password')
+    results = {}
+    for (method, path), budget in BUDGETS.items():
+        data = {'score': '4', 'activities': 'study'} if method == 'POST' else None
+        with count_queries(engine) as statements:
+            client.open(path, method=method, data=data)
+        results[f'{method} {path}'] = {'queries': len(statements), 'budget': budget}
+
+    print(json.dumps(results, indent=2))
+    over = [name for name, result in results.items() if result['queries'] > result['budget']]
+    if over:
+        raise SystemExit(f'Query budget exceeded for: {", ".join(over)}')
+
+
+if __name__ == '__main__':
+    main()
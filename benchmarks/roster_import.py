@@ -0,0 +1,83 @@
+"""Roster import throughput and peak memory for `flask import-roster`.
+
+Writes a synthetic roster (with a small share of duplicate and malformed rows), imports it,
+then interrupts and resumes a second import halfway through to exercise saved progress.
+
+    python -m benchmarks.roster_import --rows 100000 --chunk-size 2000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from app import db
+from app.models import Student, User
+from app.roster import RosterImport
+from benchmarks.common import make_app
+
+
+def write_roster(path, rows, seed=0):
+    rng = random.Random(seed)
+    with open(path, 'w') as handle:
+        handle.write('username,email,student_id,name,role\n')
+        for i in range(1, rows + 1):
+            roll = rng.random()
+            if roll < 0.01:
+                j = rng.randint(1, i)  # duplicate of an earlier (or this) row
+                handle.write(f'roster{j},roster{j}@student.example.ac.uk,{3000000 + j},Student {j},Student\n')
+            elif roll < 0.015:
+                handle.write(f'roster{i},not-an-email,{3000000 + i},Student {i},Student\n')
+            else:
+                handle.write(f'roster{i},roster{i}@student.example.ac.uk,{3000000 + i},Student {i},Student\n')
+
+
+class Interrupted(Exception):
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='roster-bench-')
+    roster_path = os.path.join(workdir, 'roster.csv')
+    write_roster(roster_path, args.rows)
+    results = {'rows': args.rows, 'chunk_size': args.chunk_size}
+
+    app = make_app()
+    with app.app_context():
+        tracemalloc.start()
+        started = time.perf_counter()
+        stats = RosterImport(roster_path, chunk_size=args.chunk_size).run(restart=True)
+        elapsed = time.perf_counter() - started
+        results['full_import'] = dict(stats, seconds=round(elapsed, 2),
+                                      rows_per_second=round(args.rows / elapsed),
+                                      peak_memory_mb=round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1))
+        tracemalloc.stop()
+        results['full_import']['users'] = db.session.scalar(db.select(db.func.count(User.id)))
+        results['full_import']['students'] = db.session.scalar(db.select(db.func.count(Student.id)))
+
+    app = make_app()
+    with app.app_context():
+        def stop_halfway(stats):
+            if stats['processed'] >= args.rows // 2:
+                raise Interrupted
+        importer = RosterImport(roster_path, chunk_size=args.chunk_size)
+        try:
+            importer.run(restart=True, report=stop_halfway)
+        except Interrupted:
+            pass
+        started = time.perf_counter()
+        stats = RosterImport(roster_path, chunk_size=args.chunk_size).run()
+        results['resumed_import'] = dict(stats, resume_seconds=round(time.perf_counter() - started, 2))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Time bulk slot generation for a semester across all services, and an idempotent re-run.
+
+    python -m benchmarks.slot_generation --services 40 --days 120
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import AppointmentSlot, SupportService
+from benchmarks.common import make_app, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--services', type=int, default=40)
+    parser.add_argument('--days', type=int, default=120)
+    parser.add_argument('--database-uri')
+    args = parser.parse_args()
+
+    app = make_app(args.database_uri)
+    results = {'services': args.services, 'days': args.days}
+    with app.app_context():
+        db.session.add_all(SupportService(f'Service {i}', 'counselling', duration=30 if i % 2 else 60)
+                           for i in range(args.services))
+        db.session.commit()
+        until = datetime.now() + timedelta(days=args.days)
+        with timed(results, 'generate_seconds'):
+            results['inserted'] = SupportService.extend_slots(until)
+            db.session.commit()
+        for service in db.session.scalars(db.select(SupportService)):
+            service.slots_generated_until = None
+        db.session.commit()
+        with timed(results, 'rerun_seconds'):
+            results['rerun_inserted'] = SupportService.extend_slots(until)
+            db.session.commit()
+        with timed(results, 'extend_one_week_seconds'):
+            results['extend_inserted'] = SupportService.extend_slots(until + timedelta(days=7))
+            db.session.commit()
+        results['total_slots'] = db.session.scalar(db.select(db.func.count()).select_from(AppointmentSlot))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
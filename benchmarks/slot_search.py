@@ -0,0 +1,87 @@
+"""Latency of the slot-availability search over a year of slots for dozens of services.
+
+    python -m benchmarks.slot_search --services 40 --queries 500
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import AppointmentSlot, SupportService
+from benchmarks.common import make_app
+
+SERVICE_TYPES = ('counselling', 'academic', 'workshop', 'mentoring')
+
+
+def seed_slots(services, days, booked_ratio, seed=0):
+    rng = random.Random(seed)
+    db.session.execute(db.insert(SupportService), [
+        {'id': i, 'name': f'Service {i}', 'service_type': SERVICE_TYPES[i % len(SERVICE_TYPES)]}
+        for i in range(1, services + 1)
+    ])
+    today = datetime.now().replace(minute=0, second=0, microsecond=0)
+    batch = []
+    for service_id in range(1, services + 1):
+        for day in range(days):
+            date = today + timedelta(days=day)
+            if date.weekday() >= 5:
+                continue
+            for hour in range(9, 17):
+                batch.append({'service_id': service_id, 'date': date.replace(hour=hour),
+                              'is_available': rng.random() >= booked_ratio})
+        db.session.execute(db.insert(AppointmentSlot), batch)
+        batch = []
+    db.session.commit()
+    return db.session.scalar(db.select(db.func.count()).select_from(AppointmentSlot))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--services', type=int, default=40)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--booked-ratio', type=float, default=0.7)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--database-uri')
+    args = parser.parse_args()
+
+    app = make_app(args.database_uri)
+    rng = random.Random(1)
+    with app.app_context():
+        slots = seed_slots(args.services, args.days, args.booked_ratio)
+        latencies = []
+        now = datetime.now()
+        for _ in range(args.queries):
+            start = now + timedelta(days=rng.randrange(args.days))
+            started = time.perf_counter()
+            AppointmentSlot.search(rng.choice(SERVICE_TYPES), start=start, end=start + timedelta(days=30),
+                                   limit=args.limit)
+            latencies.append((time.perf_counter() - started) * 1000)
+        plan = None
+        if db.engine.dialect.name == 'sqlite':
+            query = (
+                db.select(AppointmentSlot.id, AppointmentSlot.service_id, AppointmentSlot.date)
+                .where(AppointmentSlot.service_id == 1, AppointmentSlot.is_available.is_(True),
+                       AppointmentSlot.date >= now)
+                .order_by(AppointmentSlot.date, AppointmentSlot.id).limit(args.limit)
+            )
+            compiled = query.compile(db.engine, compile_kwargs={'literal_binds': True})
+            plan = [row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {compiled}'))]
+
+    latencies.sort()
+    print(json.dumps({
+        'services': args.services,
+        'slots': slots,
+        'queries': args.queries,
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        'max_ms': round(latencies[-1], 3),
+        'query_plan': plan
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
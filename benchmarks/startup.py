@@ -0,0 +1,75 @@
+"""Cold-start time of the app for web workers and for the `flask` CLI, with an import-time breakdown.
+
+Each case runs in a fresh interpreter `--runs` times and the median wall time is reported.
+The breakdown comes from `python -X importtime` and lists self time per top-level package and
+the slowest individual modules, so regressions in what create_app pulls in are easy to spot.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLASK = os.path.join(os.path.dirname(sys.executable), 'flask')
+
+CASES = {
+    # What a WSGI worker does when it boots: import the module that builds the app
+    'worker_import': [sys.executable, '-c', 'import run'],
+    'worker_first_request': [sys.executable, '-c', "from run import app; app.test_client().get('/')"],
+    # CLI cold starts: listing commands loads debug_utils; `routes` resolves a single command
+    'flask_help': [FLASK, '--app', 'run', '--help'],
+    'flask_routes': [FLASK, '--app', 'run', 'routes'],
+}
+
+
+def wall_time(command, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - started)
+    return {'median_ms': round(statistics.median(samples) * 1000, 1), 'min_ms': round(min(samples) * 1000, 1)}
+
+
+def import_breakdown(top):
+    """Parse `-X importtime` output for `import run` into per-package and per-module self times."""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import run'], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    packages = Counter()
+    for name, self_us, _ in modules:
+        packages[name.split('.')[0]] += self_us
+    slowest = sorted(modules, key=lambda module: -module[1])[:top]
+    return {
+        'total_ms': round(sum(packages.values()) / 1000, 1),
+        'modules_imported': len(modules),
+        'by_package_ms': {name: round(us / 1000, 1) for name, us in packages.most_common(top)},
+        'slowest_modules_ms': {name: round(self_us / 1000, 1) for name, self_us, _ in slowest},
+        'cli_only_loaded': sorted({name for name, _, _ in modules if name in ('alembic', 'app.debug_utils')}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    results = {name: wall_time(command, args.runs) for name, command in CASES.items()}
+    results['import_breakdown'] = import_breakdown(args.top)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
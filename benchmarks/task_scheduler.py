@@ -0,0 +1,84 @@
+"""Task lifecycle scheduler lateness and query volume with tens of thousands of tasks.
+
+Seeds tasks whose start and end boundaries fall within the next few seconds (plus many far in
+the future), runs the scheduler thread across them and reports how late each boundary was
+applied and how many statements the scheduler issued.
+
+    python -m benchmarks.task_scheduler --tasks 20000 --groups 5 --seconds 5
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Group, GroupTaskStatus, Task
+from app.scheduler import TaskLifecycleScheduler
+from benchmarks.common import count_queries, make_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--future-tasks', type=int, default=20000)
+    parser.add_argument('--groups', type=int, default=5)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    app = make_app()
+    with app.app_context():
+        db.session.execute(db.insert(Group), [{} for _ in range(args.groups)])
+        # Leave time for seeding so no boundary is already due when the scheduler starts
+        base = datetime.now() + timedelta(seconds=3)
+        rows = []
+        for i in range(args.tasks):
+            start = base + timedelta(seconds=rng.uniform(0, args.seconds / 2))
+            rows.append({'title': f'Task {i}', 'description': '', 'location': '', 'start_datetime': start,
+                         'end_datetime': start + timedelta(seconds=rng.uniform(0.1, args.seconds / 2))})
+        for i in range(args.future_tasks):
+            start = base + timedelta(days=rng.uniform(2, 120))
+            rows.append({'title': f'Future {i}', 'description': '', 'location': '', 'start_datetime': start,
+                         'end_datetime': start + timedelta(hours=2)})
+        db.session.execute(db.insert(Task), rows)
+        GroupTaskStatus.materialize()
+        db.session.commit()
+        engine = db.engine
+
+    scheduler = TaskLifecycleScheduler(app, max_sleep=60)
+    lateness = []
+    run_once = scheduler.run_once
+
+    def tracked_run_once(now=None):
+        due = run_once(now)
+        applied = datetime.now()
+        lateness.extend((applied - when).total_seconds() * 1000 for when, _, _ in due)
+        return due
+
+    scheduler.run_once = tracked_run_once
+    with count_queries(engine) as statements:
+        scheduler.start()
+        time.sleep(args.seconds + 3.5)
+        scheduler.stop()
+
+    with app.app_context():
+        counts = dict(db.session.execute(
+            db.select(GroupTaskStatus.status, db.func.count()).group_by(GroupTaskStatus.status)
+        ).all())
+    lateness.sort()
+    print(json.dumps({
+        'tasks': args.tasks + args.future_tasks,
+        'boundaries_applied': len(lateness),
+        'lateness_ms_p50': round(statistics.median(lateness), 2) if lateness else None,
+        'lateness_ms_p99': round(lateness[int(len(lateness) * 0.99) - 1], 2) if lateness else None,
+        'statements': len(statements),
+        'full_table_scans': sum('FROM tasks' in s and 'WHERE' not in s for s in statements),
+        'status_counts': counts,
+        'expected_closed': args.tasks * args.groups,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Per-object GroupTaskStatus creation versus one INSERT ... SELECT, plus a bulk status transition.
+
+    python -m benchmarks.task_status_materialization --groups 2000 --tasks 500
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Group, GroupTaskStatus, Task
+from benchmarks.common import make_app, timed
+
+
+def seed(groups, tasks):
+    # Core inserts bypass the ORM insert hooks that materialize statuses, so both strategies start from zero statuses
+    db.session.execute(db.insert(Group), [{} for _ in range(groups)])
+    now = datetime.now()
+    db.session.execute(db.insert(Task), [
+        {'title': f'Task {i}', 'description': 'Benchmark task', 'location': 'Library',
+         'start_datetime': now + timedelta(hours=i - tasks // 2),
+         'end_datetime': now + timedelta(hours=i - tasks // 2 + 1)}
+        for i in range(tasks)
+    ])
+    db.session.commit()
+
+
+def naive_materialize():
+    for group in db.session.scalars(db.select(Group)):
+        for task in db.session.scalars(db.select(Task)):
+            db.session.add(GroupTaskStatus(group_id=group.id, task_id=task.id))
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--groups', type=int, default=2000)
+    parser.add_argument('--tasks', type=int, default=500)
+    parser.add_argument('--naive-groups', type=int, default=100,
+                        help='Groups used for the per-object loop, which is too slow at full size.')
+    args = parser.parse_args()
+
+    results = {'groups': args.groups, 'tasks': args.tasks}
+    app = make_app()
+    with app.app_context():
+        seed(args.naive_groups, args.tasks)
+        with timed(results, f'naive_seconds_{args.naive_groups}_groups'):
+            naive_materialize()
+
+    app = make_app()
+    with app.app_context():
+        seed(args.groups, args.tasks)
+        with timed(results, 'bulk_seconds'):
+            results['bulk_rows'] = GroupTaskStatus.materialize()
+            db.session.commit()
+        with timed(results, 'bulk_rerun_seconds'):
+            results['bulk_rerun_rows'] = GroupTaskStatus.materialize()
+            db.session.commit()
+        with timed(results, 'activate_started_seconds'):
+            results['activated_rows'] = GroupTaskStatus.activate_started()
+            db.session.commit()
+        with timed(results, 'close_ended_seconds'):
+            results['closed_rows'] = GroupTaskStatus.close_ended()
+            db.session.commit()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
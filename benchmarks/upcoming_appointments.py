@@ -0,0 +1,74 @@
+"""Upcoming-appointment lookup for students with hundreds of past appointments.
+
+Compares loading the whole Student.appointments relationship and filtering in Python (what the
+dashboard template used to do) with the indexed, limited SQL query.
+
+    python -m benchmarks.upcoming_appointments --students 200 --past 500
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Appointment, Student
+from benchmarks.common import make_app, seed_students
+
+
+def sample(calls):
+    samples = []
+    for call in calls:
+        db.session.expunge_all()
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--past', type=int, default=500)
+    parser.add_argument('--upcoming', type=int, default=5)
+    parser.add_argument('--lookups', type=int, default=300)
+    args = parser.parse_args()
+
+    app = make_app()
+    rng = random.Random(0)
+    with app.app_context():
+        seed_students(args.students)
+        now = datetime.now()
+        for student_id in range(1, args.students + 1):
+            db.session.execute(db.insert(Appointment), [
+                {'student_id': student_id, 'service_type': 'counselling', 'status': 'completed',
+                 'date': now - timedelta(days=i + 1)}
+                for i in range(args.past)
+            ] + [
+                {'student_id': student_id, 'service_type': 'academic', 'status': 'scheduled',
+                 'date': now + timedelta(days=i + 1)}
+                for i in range(args.upcoming)
+            ])
+        db.session.commit()
+
+        ids = [rng.randint(1, args.students) for _ in range(args.lookups)]
+
+        def relationship_filter(student_id):
+            appointments = db.session.get(Student, student_id).appointments
+            return [a for a in appointments if a.date > datetime.now()][:3]
+
+        def sql_window(student_id):
+            return db.session.get(Student, student_id).upcoming_appointments(3)
+
+        assert [a.id for a in relationship_filter(1)] == [a.id for a in sql_window(1)]
+        print(json.dumps({
+            'students': args.students,
+            'past_per_student': args.past,
+            'relationship_filter_ms_p50': sample([lambda i=i: relationship_filter(i) for i in ids]),
+            'indexed_query_ms_p50': sample([lambda i=i: sql_window(i) for i in ids]),
+        }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
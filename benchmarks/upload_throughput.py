@@ -0,0 +1,119 @@
+"""Concurrent upload throughput through a local WSGI server, for whole-file and resumable uploads.
+
+Virtual users (one per group member) upload files over real HTTP: small files in one PUT and
+large ones as resumable uploads in `--chunk-mb` PATCH requests. A share of the files repeat
+earlier content to exercise dedup. Reports MB/s, blobs stored versus files uploaded, and peak
+RSS growth of the process (server and clients share it), which should stay a few chunks per
+concurrent upload rather than growing with file size.
+
+    python -m benchmarks.upload_throughput --users 8 --files 4 --file-mb 16
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Submission, Task
+from benchmarks.common import make_app
+from benchmarks.datagen import generate
+from benchmarks.loadtest import LocalServer, WSGISession, _login
+
+
+def call(session, method, path, body=None, headers=None):
+    request = urllib.request.Request(session.base_url + path, data=body, method=method, headers=headers or {})
+    with session.opener.open(request) as response:
+        return response.status, json.loads(response.read() or b'null')
+
+
+def upload_resumable(session, task_id, payload, chunk_size):
+    _, upload = call(session, 'POST', f'/tasks/{task_id}/uploads',
+                     json.dumps({'filename': 'large.bin', 'size': len(payload)}).encode(),
+                     {'Content-Type': 'application/json'})
+    offset = 0
+    while offset < len(payload):
+        chunk = payload[offset:offset + chunk_size]
+        status, _ = call(session, 'PATCH', f"/uploads/{upload['upload_id']}", chunk,
+                         {'Upload-Offset': str(offset), 'Content-Type': 'application/octet-stream'})
+        offset += len(chunk)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--files', type=int, default=4, help='Files per user.')
+    parser.add_argument('--file-mb', type=float, default=16, help='Size of the resumable (large) files.')
+    parser.add_argument('--chunk-mb', type=float, default=1.5, help='Bytes per PATCH; must stay under MAX_CONTENT_LENGTH.')
+    parser.add_argument('--duplicate-ratio', type=float, default=0.25)
+    args = parser.parse_args()
+
+    upload_dir = tempfile.mkdtemp(prefix='upload-bench-')
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', UPLOAD_FOLDER=upload_dir)
+    with app.app_context():
+        generate(students=args.users, moods=1, groups=1, messages=0)
+        task = Task(title='Submission', description='Benchmark upload task', isUpload=True, location='online',
+                    start_datetime=datetime.now(), end_datetime=datetime.now() + timedelta(days=1))
+        db.session.add(task)
+        db.session.commit()
+        task_id = task.id
+
+    rng = random.Random(0)
+    large = int(args.file_mb * 2 ** 20)
+    originals = [rng.randbytes(large) for _ in range(max(int(args.files * args.users * (1 - args.duplicate_ratio)), 1))]
+    jobs = []
+    for n in range(args.users * args.files):
+        duplicate = rng.random() < args.duplicate_ratio
+        jobs.append((n % args.users + 1, originals[rng.randrange(len(originals)) if duplicate else n % len(originals)]))
+    small = rng.randbytes(256 * 1024)
+
+    results = {'users': args.users, 'files': len(jobs), 'file_mb': args.file_mb, 'chunk_mb': args.chunk_mb}
+    with LocalServer(app) as server:
+        sessions = {}
+        for user in range(1, args.users + 1):
+            sessions[user] = WSGISession(server.base_url)
+            _login(sessions[user], user, 'password')
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            statuses = list(pool.map(
+                lambda job: upload_resumable(sessions[job[0]], task_id, job[1], int(args.chunk_mb * 2 ** 20)), jobs
+            ))
+        elapsed = time.perf_counter() - started
+        results['resumable'] = {
+            'seconds': round(elapsed, 2),
+            'mb_per_second': round(len(jobs) * large / 2 ** 20 / elapsed, 1),
+            'completed': statuses.count(201),
+            'peak_rss_growth_mb': round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024, 1),
+        }
+
+        started = time.perf_counter()
+        puts = args.users * 25
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            statuses = list(pool.map(
+                lambda n: call(sessions[n % args.users + 1], 'PUT', f'/tasks/{task_id}/submission?filename=small.bin',
+                               small, {'Content-Type': 'application/octet-stream'})[0], range(puts)
+            ))
+        elapsed = time.perf_counter() - started
+        results['single_put'] = {
+            'requests': puts,
+            'completed': statuses.count(201),
+            'requests_per_second': round(puts / elapsed, 1),
+            'mb_per_second': round(puts * len(small) / 2 ** 20 / elapsed, 1),
+        }
+
+    with app.app_context():
+        results['submissions'] = db.session.scalar(db.select(db.func.count(Submission.id)))
+    results['blobs_stored'] = sum(len(files) for _, _, files in os.walk(os.path.join(upload_dir, 'blobs')))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
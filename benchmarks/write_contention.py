@@ -0,0 +1,87 @@
+"""Write contention on a shared SQLite file under each engine profile.
+
+Writer threads log moods (entry plus rollup upserts, one transaction each) while reader
+threads page through mood history, for a fixed duration per profile. The 'dev' profile is
+the library default (rollback journal, synchronous=FULL); 'sqlite' adds WAL, busy_timeout
+and synchronous=NORMAL.
+
+    python -m benchmarks.write_contention --writers 4 --readers 4 --seconds 10
+"""
+import argparse
+import json
+import random
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.models import Student
+from app.transactions import run_in_transaction
+from benchmarks.common import make_app, seed_mood_entries, seed_students
+
+
+def run(profile, args):
+    app = make_app(DATABASE_PROFILE=profile)
+    with app.app_context():
+        seed_students(args.students)
+        seed_mood_entries(args.students, 30)
+    counts = {'writes': 0, 'reads': 0, 'write_errors': 0, 'read_errors': 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def count(key):
+        with lock:
+            counts[key] += 1
+
+    def writer(seed):
+        rng = random.Random(seed)
+        with app.app_context():
+            while not stop.is_set():
+                student_id = rng.randint(1, args.students)
+                try:
+                    run_in_transaction(lambda: db.session.get(Student, student_id).log_mood(rng.randint(1, 5)))
+                    count('writes')
+                except OperationalError:
+                    count('write_errors')
+                db.session.remove()
+
+    def reader(seed):
+        rng = random.Random(seed)
+        with app.app_context():
+            while not stop.is_set():
+                try:
+                    db.session.get(Student, rng.randint(1, args.students)).get_mood_history(limit=50)
+                    count('reads')
+                except OperationalError:
+                    count('read_errors')
+                db.session.remove()
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(100 + i,)) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {
+        **counts,
+        'writes_per_second': round(counts['writes'] / args.seconds, 1),
+        'reads_per_second': round(counts['reads'] / args.seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+    results = {profile: run(profile, args) for profile in ('dev', 'sqlite')}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
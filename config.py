@@ -10,7 +10,72 @@ class Config:
 
     UPLOAD_FOLDER = os.path.join(basedir, 'data', 'uploads')
     MAX_CONTENT_LENGTH = 2 * 1024 * 1024
+    # Larger files go through resumable uploads, each chunk request staying under MAX_CONTENT_LENGTH
+    UPLOAD_MAX_FILE_SIZE = 200 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+    # Let a fronting nginx/Apache send downloads with X-Sendfile instead of the worker
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
 
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # 'dev', 'sqlite' or 'postgres' (see app.database.ENGINE_PROFILES); picked from the URI when unset
+    DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE')
+    # Applies to web requests only, `flask run` included; other `flask` commands run without a statement timeout
+    DATABASE_STATEMENT_TIMEOUT_MS = int(os.environ.get('DATABASE_STATEMENT_TIMEOUT_MS') or 30000)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'busy_timeout': 5000,
+        'synchronous': 'NORMAL',
+    }
+
+    MOOD_HISTORY_PAGE_SIZE = 50
+    COHORT_ANALYTICS_TTL = 300
+    BOOKING_PAGE_SLOTS = 3
+    MESSAGE_FEED_PAGE_SIZE = 50
+    APPOINTMENTS_PAGE_SIZE = 20
+    EXPORT_CHUNK_SIZE = 5000
+    SLOT_HORIZON_DAYS = 14
+
+    # Opt-in write-behind for /mood/log: entries are written in group commits of up to
+    # MOOD_WRITE_BATCH_SIZE rows, or whatever has queued after MOOD_WRITE_MAX_DELAY_MS
+    MOOD_WRITE_BEHIND = os.environ.get('MOOD_WRITE_BEHIND', '').lower() in ('1', 'true', 'yes')
+    MOOD_WRITE_BATCH_SIZE = 200
+    MOOD_WRITE_MAX_DELAY_MS = 10
+    # 'commit' acknowledges an entry once its batch has committed. 'queued' acknowledges it as soon as
+    # it is buffered: the redirect can reach the dashboard before the entry does, and entries still
+    # queued when the process dies are lost
+    MOOD_WRITE_DURABILITY = os.environ.get('MOOD_WRITE_DURABILITY') or 'commit'
+    MOOD_WRITE_MAX_PENDING = 10000
+
+    TASK_SCHEDULER_LOOKAHEAD_HOURS = 24
+    TASK_SCHEDULER_MAX_SLEEP = 300
+
+    MESSAGE_BROKER = 'app.messaging:InProcessBroker'
+    MESSAGE_STREAM_BUFFER = 100
+    MESSAGE_STREAM_HEARTBEAT = 15
+
+    # Full Werkzeug method string, including cost parameters, so outdated hashes can be detected
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'
+    PASSWORD_HASH_SALT_LENGTH = 16
+    # Request-path hashing pool, started on first use; small because each web worker forks its own. 0 hashes inline
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or min(2, os.cpu_count() or 1))
+    # Processes for batch hashing (seeding, roster import), one pool reused across batches; None uses every core
+    PASSWORD_HASH_BATCH_WORKERS = int(os.environ.get('PASSWORD_HASH_BATCH_WORKERS') or 0) or None
+    PASSWORD_HASH_MAX_PENDING = None
+
+    # None follows debug mode, so templates are only re-checked for edits while developing
+    TEMPLATES_AUTO_RELOAD = None
+    TEMPLATE_BYTECODE_CACHE_DIR = os.path.join(basedir, 'data', 'jinja_cache')
+    TEMPLATE_FRAGMENT_CACHE = True
+    TEMPLATE_FRAGMENT_TTL = 300
+
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'lru'
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    CACHE_DEFAULT_TTL = 60
+    CACHE_MAX_ENTRIES = 10000
+
+    SQL_PROFILER_ENABLED = os.environ.get('SQL_PROFILER_ENABLED', '').lower() in ('1', 'true', 'yes')
+    SQL_PROFILER_LOG = os.path.join(basedir, 'data', 'sql_profile.jsonl')
+    SQL_PROFILER_N_PLUS_ONE_THRESHOLD = 5